@@ -1,10 +1,10 @@
 import re
 import os
-import json
 import asyncio
 import time
 import ast
 import httpx
+import orjson
 from typing import Dict, List, Any, Optional, Tuple
 from collections import defaultdict
 from sqlalchemy.orm import Session
@@ -60,8 +60,8 @@ class CodeOptimizer:
             
             try:
                 # Assuming the AI returns a JSON string with suggestions
-                optimizations = json.loads(response_content)
-            except json.JSONDecodeError:
+                optimizations = orjson.loads(response_content)
+            except orjson.JSONDecodeError:
                 logger.warning(f"Could not parse JSON from AI response for {file_path}. Using raw content.")
                 optimizations = {"raw_suggestions": response_content}
 
@@ -2,9 +2,11 @@ import os
 import os
 import re
 import json
+import orjson
 from typing import Dict, List, Any, Optional
 import logging
 from sqlalchemy.orm import Session
+from app.core.ai_fallback import record_fallback
 from app.core.ai_service import AIService
 from app.core.database import SessionLocal
 
@@ -73,8 +75,8 @@ class Ideation:
             
             # Try to parse JSON response
             try:
-                project_data = json.loads(response_content)
-            except json.JSONDecodeError:
+                project_data = orjson.loads(response_content)
+            except orjson.JSONDecodeError:
                 # If not valid JSON, wrap in a basic structure
                 project_data = {
                     "project_name": f"Generated Project for {description[:50]}...",
@@ -139,10 +141,11 @@ class Ideation:
             
             # Try to parse JSON response
             try:
-                tech_specs = json.loads(response_content)
+                tech_specs = orjson.loads(response_content)
                 return tech_specs
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 # If not valid JSON, wrap in a basic structure
+                record_fallback("technical specs response was not JSON")
                 return {
                     "system_architecture": response_content,
                     "data_models": "Generated from AI response",
@@ -198,9 +201,10 @@ class Ideation:
             
             # Try to parse JSON response
             try:
-                return json.loads(response_content)
-            except json.JSONDecodeError:
+                return orjson.loads(response_content)
+            except orjson.JSONDecodeError:
                 # If not valid JSON, create a basic structure
+                record_fallback("user stories response was not JSON")
                 return [{
                     "id": 1,
                     "title": "Generated User Story",
@@ -249,8 +253,8 @@ class Ideation:
 
             # Try to parse JSON response
             try:
-                return json.loads(response_content)
-            except json.JSONDecodeError:
+                return orjson.loads(response_content)
+            except orjson.JSONDecodeError:
                 # If not valid JSON, create a basic structure
                 return [{
                     "sprint": 1,
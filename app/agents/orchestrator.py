@@ -7,19 +7,28 @@ Coordinates multiple AI agents to execute complex workflows
 """
 
 import asyncio
-from typing import Dict, Any, List
+import builtins
+import hashlib
+import logging
+import sys
+import time
+from collections import ChainMap
+from dataclasses import asdict, dataclass
+from functools import cached_property, lru_cache
+from typing import Dict, Any, List, Optional, Callable, Awaitable, AsyncIterator, Set, FrozenSet, Tuple, Union
 from enum import Enum
 
-# Import all agents
-from app.agents.ideation import Ideation
-from app.agents.code_optimizer import CodeOptimizer
-from app.agents.security_analyzer import SecurityAnalyzer
-from app.agents.test_generator import TestGenerator
-from app.agents.doc_generator import DocGenerator
-from app.agents.pr_reviewer import PRReviewer
+import orjson
 
 # Import the new LLM models system
 from app.models.llm_models import get_llm_provider, set_llm_provider, LLMFactory
+from app.core.config import settings
+from app.core.ai_fallback import track_fallbacks
+from app.core.result_cache import ResultCache
+from app.core.concurrency import llm_semaphore
+
+logger = logging.getLogger(__name__)
+
 
 class WorkflowStep(Enum):
     IDEATION = "ideation"
@@ -29,91 +38,114 @@ class WorkflowStep(Enum):
     DOCUMENTATION = "documentation"
     CODE_REVIEW = "code_review"
 
-class AgentOrchestrator:
-    """Orchestrates multiple AI agents for complex workflows"""
-    
-    def __init__(self, llm_provider: str = None, llm_model: str = None):
-        # Initialize all agents
-        self.ideation_agent = Ideation()
-        self.code_optimizer = CodeOptimizer()
-        self.security_analyzer = SecurityAnalyzer()
-        self.test_generator = TestGenerator()
-        self.doc_generator = DocGenerator()
-        self.pr_reviewer = PRReviewer()
-        
-        # Set up LLM provider if specified
-        if llm_provider:
-            set_llm_provider(llm_provider, llm_model)
+# Steps whose results each step reads; dependencies absent from a workflow are treated as met
+STEP_DEPENDENCIES: Dict[WorkflowStep, Set[WorkflowStep]] = {
+    WorkflowStep.IDEATION: set(),
+    WorkflowStep.CODE_GENERATION: {WorkflowStep.IDEATION},
+    WorkflowStep.SECURITY_ANALYSIS: {WorkflowStep.CODE_GENERATION},
+    WorkflowStep.TEST_GENERATION: {WorkflowStep.CODE_GENERATION},
+    WorkflowStep.DOCUMENTATION: {WorkflowStep.CODE_GENERATION},
+    WorkflowStep.CODE_REVIEW: {
+        WorkflowStep.SECURITY_ANALYSIS,
+        WorkflowStep.TEST_GENERATION,
+        WorkflowStep.DOCUMENTATION
+    }
+}
+
+# Display name, description and estimated run time per workflow template
+WORKFLOW_DESCRIPTIONS: Dict[str, Tuple[str, str, str]] = {
+    "full_development": ("Full Development Cycle", "Complete development workflow with all agents", "5-8 minutes"),
+    "code_improvement": ("Code Improvement", "Focus on optimizing existing code", "3-5 minutes"),
+    "security_focused": ("Security Analysis", "Security-focused code review and testing", "2-3 minutes"),
+    "documentation_focused": ("Documentation", "Generate and review project documentation", "1-2 minutes")
+}
+
+# How long each agent's cached output stays valid: security findings go
+# stale fastest, generated docs and ideation the slowest
+AGENT_CACHE_TTLS: Dict[str, int] = {
+    "ideation": 24 * 3600,
+    "security_analyzer": 3600,
+    "test_generator": 6 * 3600,
+    "doc_generator": 24 * 3600
+}
+
+@lru_cache(maxsize=1)
+def _shared_agent_cache() -> ResultCache:
+    """Agent result cache shared by every orchestrator in the process.
     
-    async def execute_step(self, step_key: str, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Execute a specific workflow step"""
-        step_methods = {
-            "ideation": self._run_ideation_step,
-            "code_generation": self._run_code_generation_step,
-            "security_analysis": self._run_security_analysis_step,
-            "test_generation": self._run_test_generation_step,
-            "documentation": self._run_documentation_step,
-            "code_review": self._run_code_review_step
-        }
-        
-        if step_key in step_methods:
-            return await step_methods[step_key](context)
-        else:
-            raise ValueError(f"Unknown step: {step_key}")
-
-    async def _run_ideation_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate project ideas and technical specifications"""
-        description = context.get("project_description", "")
-        language = context.get("programming_language", "python")
-        
-        # Generate project scope
-        project_scope = await self.ideation_agent.generate_project_scope(description)
-        
-        # Generate user stories
-        user_stories = await self.ideation_agent.generate_user_stories(project_scope)
-        
-        # Generate technical specifications
-        technical_specs = await self.ideation_agent.generate_technical_specs(project_scope)
-        
-        display_content = f"""💡 IDEATION & PLANNING RESULTS
-===============================
-
-🎯 PROJECT SCOPE:
-{project_scope.get('project_name', 'Unnamed Project')}
-{project_scope.get('description', 'No description available')}
-
-🏗️ TECHNICAL ARCHITECTURE:
-• Framework: {technical_specs.get('framework', 'Not specified')}
-• Database: {technical_specs.get('database', 'Not specified')}
-• Authentication: {technical_specs.get('authentication', 'Not specified')}
-• Deployment: {technical_specs.get('deployment', 'Not specified')}
-
-👥 USER STORIES ({len(user_stories)} total):
-{chr(10).join([f"• {story.get('title', 'Untitled Story')}" for story in user_stories[:5]])}
-{'...' if len(user_stories) > 5 else ''}
-
-🔧 DEVELOPMENT APPROACH:
-• Programming Language: {language.title()}
-• Development Methodology: Agile
-• Testing Strategy: Unit + Integration Tests
-• Documentation: Comprehensive API docs"""
-        
-        return {
-            "agent_name": "IdeationAgent",
-            "step_type": "ideation", 
-            "project_scope": project_scope,
-            "user_stories": user_stories,
-            "technical_specs": technical_specs,
-            "summary": f"Generated project scope with {len(user_stories)} user stories",
-            "display_content": display_content
-        }    
-    async def _run_code_generation_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate complete application code"""
-        language = context.get("programming_language", context.get("language", "python"))
-        
-        # Generate complete application files
-        generated_files = {
-            "main.py": '''"""
+    Routes build an orchestrator per request, so a per-instance cache would
+    lose its memory tier and re-read the disk tier on every request.
+    """
+    return ResultCache(
+        maxsize=settings.AGENT_RESULT_CACHE_SIZE,
+        path=settings.AGENT_RESULT_CACHE_FILE or None
+    )
+
+
+# Agent calls currently awaiting the LLM, by cache key. Shared by every
+# orchestrator, since concurrent workflow requests each build their own.
+_inflight_agent_calls: Dict[str, asyncio.Future] = {}
+
+
+def _is_cacheable(value: Any) -> bool:
+    """Whether an agent result may be cached; fallback and error payloads
+    stand in for a failed LLM call, so the next identical call retries it"""
+    if not isinstance(value, dict):
+        return True
+    if value.get("status") == "error":
+        return False
+    return (value.get("ai_status") or {}).get("provider") != "fallback"
+
+
+# Step handlers are coroutines unless they have nothing to await, in which
+# case they return their result directly and skip an event-loop hop
+StepHandler = Callable[[Dict[str, Any]], Union[Dict[str, Any], Awaitable[Dict[str, Any]]]]
+
+
+async def _call_step_handler(handler: StepHandler, context: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a step handler, awaiting it only if it returned a coroutine"""
+    result = handler(context)
+    if asyncio.iscoroutine(result):
+        result = await result
+    return result
+
+
+@lru_cache(maxsize=256)
+def _content_digest(content: str) -> str:
+    """Digest of a large agent input, so code shared by several steps is hashed once"""
+    return hashlib.blake2b(content.encode()).hexdigest()
+
+
+# Eager tasks run synchronously until their first real suspension, so steps
+# served from the agent cache finish without an extra event-loop round trip
+if sys.version_info >= (3, 12):
+    def _start_task(coro: Awaitable[Any]) -> asyncio.Task:
+        return asyncio.Task(coro, loop=asyncio.get_running_loop(), eager_start=True)
+else:
+    _start_task = asyncio.create_task
+
+
+async def _run_concurrently(*coros: Awaitable[Any]) -> List[Any]:
+    """Await coroutines concurrently, cancelling the rest if one fails"""
+    if sys.version_info >= (3, 11):
+        try:
+            async with asyncio.TaskGroup() as tg:
+                tasks = [tg.create_task(coro) for coro in coros]
+        except Exception as error:
+            # Surface the underlying failure, as gather would, so step errors
+            # name the sub-call that failed rather than the task group.
+            # BaseExceptionGroup is only a builtin from 3.11 on.
+            if isinstance(error, getattr(builtins, "BaseExceptionGroup", ())):
+                raise error.exceptions[0] from None
+            raise
+        return [task.result() for task in tasks]
+    return list(await asyncio.gather(*coros))
+
+
+# Files emitted by the code generation step; built once at import rather
+# than re-created on every run
+GENERATED_APP_FILES: Dict[str, str] = {
+    "main.py": '''"""
 FastAPI Application
 ==================
 """
@@ -156,7 +188,8 @@ async def get_items():
 
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", port=8000, reload=True)
-''',            "models.py": '''"""
+''',
+    "models.py": '''"""
 Pydantic Models
 ==============
 """
@@ -183,12 +216,12 @@ class ItemResponse(ItemBase):
     id: int
     created_at: datetime
 ''',
-            "requirements.txt": '''fastapi==0.104.1
+    "requirements.txt": '''fastapi==0.104.1
 uvicorn[standard]==0.24.0
 pydantic[email]==2.5.0
 python-multipart==0.0.6
 ''',
-            "README.md": '''# Generated FastAPI Application
+    "README.md": '''# Generated FastAPI Application
 
 ## Overview
 Auto-generated FastAPI application with CRUD operations.
@@ -202,11 +235,38 @@ python main.py
 ## API Documentation
 Visit `http://localhost:8000/docs` for interactive API documentation.
 '''
-        }        
-        display_content = f"""💻 CODE GENERATION RESULTS
+}
+
+
+# Display text for each step; the fixed parts are built once at import and
+# only the per-run values are filled in
+IDEATION_DISPLAY = """💡 IDEATION & PLANNING RESULTS
+===============================
+
+🎯 PROJECT SCOPE:
+{project_name}
+{description}
+
+🏗️ TECHNICAL ARCHITECTURE:
+• Framework: {framework}
+• Database: {database}
+• Authentication: {authentication}
+• Deployment: {deployment}
+
+👥 USER STORIES ({story_count} total):
+{story_lines}
+{more_stories}
+
+🔧 DEVELOPMENT APPROACH:
+• Programming Language: {language}
+• Development Methodology: Agile
+• Testing Strategy: Unit + Integration Tests
+• Documentation: Comprehensive API docs"""
+
+CODE_GENERATION_DISPLAY = """💻 CODE GENERATION RESULTS
 ============================
 
-📁 GENERATED FILES ({len(generated_files)} files):
+📁 GENERATED FILES ({file_count} files):
 
 📄 main.py
    Lines: 45 | Language: {language}
@@ -233,32 +293,14 @@ Visit `http://localhost:8000/docs` for interactive API documentation.
 • All dependencies specified
 • Modular code structure
 • Environment configuration support"""
-        
-        return {
-            "agent_name": "CodeGenerator", 
-            "step_type": "code_generation",
-            "generated_files": generated_files,
-            "file_count": len(generated_files),
-            "primary_language": language,
-            "application_type": "FastAPI Web Application",
-            "summary": f"Generated {len(generated_files)} complete application files",
-            "display_content": display_content
-        }    
-    async def _run_security_analysis_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Analyze code for security vulnerabilities"""
-        generated_files = context.get("generated_files", {})
-        main_code = generated_files.get("main.py", "")
-        language = context.get("programming_language", "python")
-        
-        result = await self.security_analyzer.analyze_security(main_code, language, ["owasp_top_10"])
-        
-        display_content = f"""🔒 SECURITY ANALYSIS RESULTS
+
+SECURITY_ANALYSIS_DISPLAY = """🔒 SECURITY ANALYSIS RESULTS
 ==============================
 
-🛡️ SECURITY SCORE: {result.get('score', {}).get('overall', 85)}/100
+🛡️ SECURITY SCORE: {overall_score}/100
 Grade: B+
 
-⚠️ VULNERABILITIES FOUND ({len(result.get('vulnerabilities', []))} total):
+⚠️ VULNERABILITIES FOUND ({vulnerability_count} total):
 1. Input Validation - Medium severity
    Implement comprehensive input validation for all endpoints
 2. Rate Limiting - Low severity  
@@ -278,28 +320,11 @@ Grade: B+
 • Pydantic validation
 • FastAPI security features
 • Structured error handling"""
-        
-        return {
-            "agent_name": "SecurityAnalyzer",
-            "step_type": "security_analysis", 
-            "vulnerabilities": result.get("vulnerabilities", []),
-            "security_score": result.get("score", {}),
-            "recommendations": result.get("recommendations", []),
-            "summary": f"Found {len(result.get('vulnerabilities', []))} security issues",
-            "display_content": display_content
-        }    
-    async def _run_test_generation_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate comprehensive tests"""
-        generated_files = context.get("generated_files", {})
-        main_code = generated_files.get("main.py", "")
-        language = context.get("programming_language", "python")
-        
-        result = await self.test_generator.generate_tests(main_code, language, "pytest")
-        
-        display_content = f"""🧪 TEST GENERATION RESULTS
+
+TEST_GENERATION_DISPLAY = """🧪 TEST GENERATION RESULTS
 ===========================
 
-📊 TEST COVERAGE: {result.get('coverage', {}).get('overall', 85)}%
+📊 TEST COVERAGE: {coverage}%
 • Unit Tests: 80%
 • Integration Tests: 75%
 • API Tests: 90%
@@ -324,25 +349,8 @@ API Tests (3 tests):
 • Error handling validation
 • Mock data generation
 • Automated test execution"""
-        
-        return {
-            "agent_name": "TestGenerator",
-            "step_type": "test_generation",
-            "test_cases": result.get("test_cases", {}),
-            "coverage": result.get("coverage", {}),
-            "test_files": result.get("test_files", {}),
-            "summary": f"Generated {len(result.get('test_cases', {}))} test cases",
-            "display_content": display_content
-        }    
-    async def _run_documentation_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Generate comprehensive documentation"""
-        generated_files = context.get("generated_files", {})
-        main_code = generated_files.get("main.py", "")
-        language = context.get("programming_language", "python")
-        
-        result = await self.doc_generator.generate_docs(main_code, language, "FastAPI Application")
-        
-        display_content = f"""📚 DOCUMENTATION GENERATED
+
+DOCUMENTATION_DISPLAY = """📚 DOCUMENTATION GENERATED
 ============================
 
 📖 COMPREHENSIVE DOCUMENTATION CREATED:
@@ -376,23 +384,8 @@ API Tests (3 tests):
 • API reference documentation
 • Security implementation guide
 • Testing documentation"""
-        
-        return {
-            "agent_name": "DocGenerator",
-            "step_type": "documentation",
-            "documentation": result.get("documentation", {}),
-            "api_docs": result.get("api_documentation", {}), 
-            "summary": "Generated comprehensive documentation",
-            "display_content": display_content
-        }    
-    async def _run_code_review_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
-        """Perform comprehensive code review"""
-        security_score = context.get("security_score", {})
-        test_coverage = context.get("coverage", {})
-        
-        overall_score = 85
-        
-        display_content = f"""👨‍💻 CODE REVIEW RESULTS
+
+CODE_REVIEW_DISPLAY = """👨‍💻 CODE REVIEW RESULTS
 =========================
 
 🎯 OVERALL SCORE: {overall_score}/100
@@ -426,6 +419,567 @@ Grade: B+
 ✅ Documentation complete
 ✅ Performance optimized
 ✅ Error handling robust"""
+
+
+@dataclass(slots=True, frozen=True)
+class TimelineEntry:
+    """Timing record for one completed workflow step"""
+    step: str
+    duration: float
+    timestamp: float
+    success: bool
+
+
+@dataclass(slots=True, frozen=True)
+class SecurityReport:
+    """The parts of a SecurityAnalyzer result the security step reports on"""
+    vulnerabilities: List[Any]
+    score: Dict[str, Any]
+    recommendations: List[Any]
+    overall_score: int
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "SecurityReport":
+        score = result.get("score") or {}
+        return cls(
+            vulnerabilities=result.get("vulnerabilities", []),
+            score=score,
+            recommendations=result.get("recommendations", []),
+            overall_score=score.get("overall", 85)
+        )
+
+
+@dataclass(slots=True, frozen=True)
+class GeneratedTestsReport:
+    """The parts of a TestGenerator result the test step reports on"""
+    test_cases: Dict[str, Any]
+    coverage: Dict[str, Any]
+    test_files: Dict[str, Any]
+    overall_coverage: int
+
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> "GeneratedTestsReport":
+        coverage = result.get("coverage") or {}
+        return cls(
+            test_cases=result.get("test_cases", {}),
+            coverage=coverage,
+            test_files=result.get("test_files", {}),
+            overall_coverage=coverage.get("overall", 85)
+        )
+
+
+class OrchestrationResult:
+    """Aggregated outcome of a multi-step workflow run"""
+    
+    __slots__ = ("steps", "timeline", "success", "error_message", "total_time",
+                 "_completed_steps", "_fastest", "_slowest")
+    
+    def __init__(self):
+        self.steps: Dict[str, Any] = {}
+        self.timeline: List[TimelineEntry] = []
+        self.success = True
+        self.error_message: Optional[str] = None
+        self.total_time = 0.0
+        # Running aggregates kept up to date by add_step_result, so the
+        # summary never rescans the timeline
+        self._completed_steps = 0
+        self._fastest: Optional[TimelineEntry] = None
+        self._slowest: Optional[TimelineEntry] = None
+    
+    def add_step_result(self, step: WorkflowStep, result: Optional[Dict[str, Any]], duration: float,
+                        success: bool, error: Optional[Exception] = None):
+        """Record the result and timing of a single workflow step"""
+        self.steps[step.value] = result
+        entry = TimelineEntry(step.value, duration, time.time(), success)
+        self.timeline.append(entry)
+        
+        if success:
+            self._completed_steps += 1
+        else:
+            self.success = False
+            self.error_message = f"Step {step.value} failed: {error}"
+        if self._fastest is None or duration < self._fastest.duration:
+            self._fastest = entry
+        if self._slowest is None or duration > self._slowest.duration:
+            self._slowest = entry
+    
+    @property
+    def summary(self) -> Dict[str, Any]:
+        """Summarize step counts and timings"""
+        total_steps = len(self.timeline)
+        return {
+            "total_steps": total_steps,
+            "completed_steps": self._completed_steps,
+            "success_rate": self._completed_steps / total_steps if total_steps else 0.0,
+            "fastest_step": self._fastest.step if self._fastest else None,
+            "slowest_step": self._slowest.step if self._slowest else None
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "success": self.success,
+            "error_message": self.error_message,
+            "total_time": self.total_time,
+            "steps": self.steps,
+            "timeline": [asdict(entry) for entry in self.timeline],
+            "summary": self.summary
+        }
+    
+    def encode(self) -> bytes:
+        """Serialize the result to JSON bytes"""
+        # orjson serializes the timeline dataclasses natively, so skip the
+        # per-entry dict conversion to_dict does
+        return orjson.dumps({
+            "success": self.success,
+            "error_message": self.error_message,
+            "total_time": self.total_time,
+            "steps": self.steps,
+            "timeline": self.timeline,
+            "summary": self.summary
+        }, default=str, option=orjson.OPT_NON_STR_KEYS)
+
+# Lazily built agent attributes of AgentOrchestrator, closed by aclose
+_AGENT_ATTRIBUTES = ("ideation_agent", "code_optimizer", "security_analyzer",
+                     "test_generator", "doc_generator", "pr_reviewer")
+
+
+class AgentOrchestrator:
+    """Orchestrates multiple AI agents for complex workflows"""
+    
+    def __init__(self, llm_provider: str = None, llm_model: str = None):
+        # Agent outputs keyed by a digest of the agent call and its inputs, so
+        # repeated workflows over the same description or code skip the LLM
+        self._agent_cache = _shared_agent_cache()
+        # Futures for agent calls currently awaiting the LLM, by the same key
+        self._inflight = _inflight_agent_calls
+        
+        # Workflow templates: ordered steps per workflow type
+        self.workflows = {
+            "full_development": (
+                WorkflowStep.IDEATION,
+                WorkflowStep.CODE_GENERATION,
+                WorkflowStep.SECURITY_ANALYSIS,
+                WorkflowStep.TEST_GENERATION,
+                WorkflowStep.DOCUMENTATION,
+                WorkflowStep.CODE_REVIEW
+            ),
+            "code_improvement": (
+                WorkflowStep.CODE_GENERATION,
+                WorkflowStep.SECURITY_ANALYSIS,
+                WorkflowStep.TEST_GENERATION,
+                WorkflowStep.CODE_REVIEW
+            ),
+            "security_focused": (
+                WorkflowStep.SECURITY_ANALYSIS,
+                WorkflowStep.TEST_GENERATION
+            ),
+            "documentation_focused": (
+                WorkflowStep.DOCUMENTATION,
+                WorkflowStep.CODE_REVIEW
+            )
+        }
+        
+        # Workflow metadata never changes after construction, so describe it once
+        self._available_workflows: Dict[str, Dict[str, Any]] = {
+            workflow_type: {
+                "name": WORKFLOW_DESCRIPTIONS[workflow_type][0],
+                "description": WORKFLOW_DESCRIPTIONS[workflow_type][1],
+                "estimated_time": WORKFLOW_DESCRIPTIONS[workflow_type][2],
+                "steps": [step.value for step in steps]
+            }
+            for workflow_type, steps in self.workflows.items()
+        }
+        
+        # Step handlers and the context keys each step hands to later steps,
+        # resolved once so per-step dispatch is a single dict lookup
+        self._step_handlers: Dict[WorkflowStep, StepHandler] = {
+            WorkflowStep.IDEATION: self._run_ideation_step,
+            WorkflowStep.CODE_GENERATION: self._run_code_generation_step,
+            WorkflowStep.SECURITY_ANALYSIS: self._run_security_analysis_step,
+            WorkflowStep.TEST_GENERATION: self._run_test_generation_step,
+            WorkflowStep.DOCUMENTATION: self._run_documentation_step,
+            WorkflowStep.CODE_REVIEW: self._run_code_review_step
+        }
+        # Each workflow template resolved once to (step, handler, in-workflow
+        # dependencies), so execution never re-dispatches on the step enum
+        self._compiled_workflows: Dict[str, Tuple[Tuple[WorkflowStep, StepHandler, FrozenSet[WorkflowStep]], ...]] = {
+            name: tuple(
+                (step, self._step_handlers[step], frozenset(STEP_DEPENDENCIES[step].intersection(steps)))
+                for step in steps
+            )
+            for name, steps in self.workflows.items()
+        }
+        self._context_extractors: Dict[WorkflowStep, Callable[[Dict[str, Any]], Dict[str, Any]]] = {
+            WorkflowStep.IDEATION: lambda r: {
+                "project_scope": r.get("project_scope", {}),
+                "technical_specs": r.get("technical_specs", {}),
+                "user_stories": r.get("user_stories", [])
+            },
+            WorkflowStep.CODE_GENERATION: lambda r: {
+                "generated_files": r.get("generated_files", {}),
+                "primary_language": r.get("primary_language")
+            },
+            WorkflowStep.SECURITY_ANALYSIS: lambda r: {
+                "vulnerabilities": r.get("vulnerabilities", []),
+                "security_score": r.get("security_score", {})
+            },
+            WorkflowStep.TEST_GENERATION: lambda r: {
+                "test_cases": r.get("test_cases", {}),
+                "coverage": r.get("coverage", {})
+            },
+            WorkflowStep.DOCUMENTATION: lambda r: {
+                "documentation": r.get("documentation", {})
+            },
+            WorkflowStep.CODE_REVIEW: lambda r: {
+                "review_score": r.get("review_score", {})
+            }
+        }
+        
+        # Set up LLM provider if specified
+        if llm_provider:
+            set_llm_provider(llm_provider, llm_model)
+    
+    # Agents are imported and built on first use, so a workflow only pays
+    # the import cost of the agents its steps actually call. Each agent opens
+    # its own DB session and AI service, as sessions aren't safe to share
+    # between concurrent steps; the provider clients behind them are shared
+    # process-wide by AIService.
+    @cached_property
+    def ideation_agent(self):
+        from app.agents.ideation import Ideation
+        return Ideation()
+    
+    @cached_property
+    def code_optimizer(self):
+        from app.agents.code_optimizer import CodeOptimizer
+        return CodeOptimizer()
+    
+    @cached_property
+    def security_analyzer(self):
+        from app.agents.security_analyzer import SecurityAnalyzer
+        return SecurityAnalyzer()
+    
+    @cached_property
+    def test_generator(self):
+        from app.agents.test_generator import TestGenerator
+        return TestGenerator()
+    
+    @cached_property
+    def doc_generator(self):
+        from app.agents.doc_generator import DocGenerator
+        return DocGenerator()
+    
+    @cached_property
+    def pr_reviewer(self):
+        from app.agents.pr_reviewer import PRReviewer
+        return PRReviewer()
+    
+    async def aclose(self):
+        """Release the DB sessions and HTTP clients of the agents built so far"""
+        for name in _AGENT_ATTRIBUTES:
+            agent = self.__dict__.get(name)
+            if agent is not None:
+                agent.db_session.close()
+        if "pr_reviewer" in self.__dict__:
+            await self.pr_reviewer.aclose()
+    
+    def get_available_workflows(self) -> Dict[str, Dict[str, Any]]:
+        """Describe the workflow templates this orchestrator can run"""
+        return self._available_workflows
+    
+    async def execute_workflow(self, workflow_type: str, initial_input: Dict[str, Any]) -> OrchestrationResult:
+        """Run every step of a workflow template, threading results through a layered context"""
+        result = OrchestrationResult()
+        start_time = time.perf_counter()
+        
+        async for step, step_result, duration, error in self._iter_steps(workflow_type, initial_input):
+            result.add_step_result(step, step_result, duration, error is None, error)
+        
+        result.total_time = time.perf_counter() - start_time
+        return result
+    
+    async def stream_workflow(self, workflow_type: str, initial_input: Dict[str, Any]) -> AsyncIterator[Dict[str, Any]]:
+        """Yield a "started" event as each step is launched and a "finished" event with
+        its outcome as soon as it completes, without buffering the whole run"""
+        async for step, step_result, duration, error in self._iter_steps(workflow_type, initial_input,
+                                                                        report_starts=True):
+            if duration is None:
+                yield {"step": step.value, "event": "started"}
+                continue
+            yield {
+                "step": step.value,
+                "event": "finished",
+                "success": error is None,
+                "duration": duration,
+                "error": str(error) if error is not None else None,
+                "result": step_result
+            }
+    
+    async def _iter_steps(self, workflow_type: str, initial_input: Dict[str, Any],
+                          report_starts: bool = False) -> AsyncIterator[Tuple[WorkflowStep, Optional[Dict[str, Any]], Optional[float], Optional[Exception]]]:
+        """Schedule a workflow's steps and yield (step, result, duration, error) in completion order.
+        
+        With report_starts, (step, None, None, None) is also yielded as each
+        step is launched, before any of its outcome is known.
+        """
+        compiled_steps = self._compiled_workflows.get(workflow_type)
+        if compiled_steps is None:
+            raise ValueError(f"Unknown workflow: {workflow_type}")
+        
+        # Each completed step pushes a new layer on top of the caller's input
+        # instead of copying and mutating one shared dict
+        context = ChainMap(initial_input)
+        
+        waiting = list(compiled_steps)
+        finished_steps: Set[WorkflowStep] = set()
+        pending: Dict[asyncio.Task, WorkflowStep] = {}
+        
+        try:
+            while waiting or pending:
+                # Start each step as soon as the steps it reads from have finished,
+                # so independent steps overlap instead of waiting their turn
+                for entry in list(waiting):
+                    step, handler, dependencies = entry
+                    if dependencies <= finished_steps:
+                        waiting.remove(entry)
+                        pending[_start_task(self._timed_step(step, handler, context))] = step
+                        if report_starts:
+                            yield step, None, None, None
+                
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step = pending.pop(task)
+                    step_result, duration, error = task.result()
+                    finished_steps.add(step)
+                    
+                    if error is None:
+                        context = context.new_child(self._extract_context_from_result(step, step_result))
+                    yield step, step_result, duration, error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def execute_full_workflow(self, description: str, language: str = "python") -> Dict[str, Any]:
+        """Run the full development workflow for a project description.
+        
+        Security analysis, test generation and documentation only depend on
+        the generated code, so the scheduler runs them concurrently.
+        """
+        result = await self.execute_workflow(
+            "full_development",
+            {"description": description, "language": language}
+        )
+        return result.to_dict()
+    
+    async def _call_agent(self, name: str, call: Callable[..., Awaitable[Any]], *args: Any) -> Any:
+        """Await an agent call under the LLM semaphore, reusing a cached or in-flight result for identical inputs"""
+        # Large string inputs (generated code) are keyed by their digest; the
+        # security, test and doc steps all pass the same code string
+        key_args = [
+            _content_digest(arg) if isinstance(arg, str) and len(arg) > 1024 else arg
+            for arg in args
+        ]
+        key = hashlib.blake2b(
+            orjson.dumps([name, key_args], option=orjson.OPT_SORT_KEYS, default=str)
+        ).hexdigest()
+        cached = self._agent_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        # Coalesce concurrent identical calls (e.g. two workflows over the same
+        # code) onto the one already talking to the LLM
+        while (inflight := self._inflight.get(key)) is not None:
+            try:
+                return await asyncio.shield(inflight)
+            except asyncio.CancelledError:
+                # Only retry when the leading call was cancelled, not this one
+                if not inflight.cancelled():
+                    raise
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            # Caps outbound LLM calls, shared with every other orchestrator
+            # and PR reviewer in the process
+            async with llm_semaphore():
+                with track_fallbacks() as fallbacks:
+                    value = await call(*args)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so an error nobody else waited on is not logged twice
+            future.exception()
+            raise
+        else:
+            future.set_result(value)
+        finally:
+            self._inflight.pop(key, None)
+        
+        # Caching happens once the call has succeeded, so a failed cache
+        # write can never turn into a step failure. Results built from a
+        # fallback generation look like any other, so skip those as well.
+        if not fallbacks and _is_cacheable(value):
+            ttl = AGENT_CACHE_TTLS.get(name.split(".", 1)[0], settings.AGENT_RESULT_CACHE_TTL_SECONDS)
+            await self._agent_cache.set(key, value, ttl)
+        return value
+    
+    async def _timed_step(self, step: WorkflowStep,
+                          handler: StepHandler,
+                          context: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], float, Optional[Exception]]:
+        """Run a step's handler, returning its result, duration and any error raised"""
+        step_start = time.perf_counter()
+        try:
+            step_result, error = await _call_step_handler(handler, context), None
+        except Exception as e:
+            logger.exception("Error in step %s: %s", step.value, e)
+            step_result, error = None, e
+        return step_result, time.perf_counter() - step_start, error
+    
+    def _extract_context_from_result(self, step: WorkflowStep, result: Dict[str, Any]) -> Dict[str, Any]:
+        """Pick out the keys a step's result contributes to later steps"""
+        return self._context_extractors.get(step, lambda r: {})(result)
+    
+    async def execute_step(self, step_key: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute a specific workflow step"""
+        try:
+            handler = self._step_handlers[WorkflowStep(step_key)]
+        except ValueError:
+            raise ValueError(f"Unknown step: {step_key}") from None
+        return await _call_step_handler(handler, context)
+
+    async def _run_ideation_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate project ideas and technical specifications"""
+        description = context.get("project_description", context.get("description", ""))
+        language = context.get("programming_language", context.get("language", "python"))
+        
+        # Generate project scope
+        project_scope = await self._call_agent(
+            "ideation.project_scope", self.ideation_agent.generate_project_scope, description)
+        
+        # User stories and technical specifications both build on the scope
+        # alone, so generate them concurrently
+        user_stories, technical_specs = await _run_concurrently(
+            self._call_agent(
+                "ideation.user_stories", self.ideation_agent.generate_user_stories, project_scope),
+            self._call_agent(
+                "ideation.technical_specs", self.ideation_agent.generate_technical_specs, project_scope)
+        )
+        
+        story_lines = "\n".join(f"• {story.get('title', 'Untitled Story')}" for story in user_stories[:5])
+        display_content = IDEATION_DISPLAY.format(
+            project_name=project_scope.get('project_name', 'Unnamed Project'),
+            description=project_scope.get('description', 'No description available'),
+            framework=technical_specs.get('framework', 'Not specified'),
+            database=technical_specs.get('database', 'Not specified'),
+            authentication=technical_specs.get('authentication', 'Not specified'),
+            deployment=technical_specs.get('deployment', 'Not specified'),
+            story_count=len(user_stories),
+            story_lines=story_lines,
+            more_stories='...' if len(user_stories) > 5 else '',
+            language=language.title()
+        )
+        
+        return {
+            "agent_name": "IdeationAgent",
+            "step_type": "ideation", 
+            "project_scope": project_scope,
+            "user_stories": user_stories,
+            "technical_specs": technical_specs,
+            "summary": f"Generated project scope with {len(user_stories)} user stories",
+            "display_content": display_content
+        }    
+    def _run_code_generation_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate complete application code (synchronous: it makes no agent calls)"""
+        language = context.get("programming_language", context.get("language", "python"))
+        
+        # Copy so callers that add or edit files never touch the shared template
+        generated_files = dict(GENERATED_APP_FILES)
+        
+        display_content = CODE_GENERATION_DISPLAY.format(file_count=len(generated_files), language=language)
+        
+        return {
+            "agent_name": "CodeGenerator", 
+            "step_type": "code_generation",
+            "generated_files": generated_files,
+            "file_count": len(generated_files),
+            "primary_language": language,
+            "application_type": "FastAPI Web Application",
+            "summary": f"Generated {len(generated_files)} complete application files",
+            "display_content": display_content
+        }    
+    async def _run_security_analysis_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Analyze code for security vulnerabilities"""
+        generated_files = context.get("generated_files", {})
+        main_code = generated_files.get("main.py", context.get("code") or "")
+        language = context.get("programming_language", context.get("language", "python"))
+        
+        report = SecurityReport.from_result(await self._call_agent(
+            "security_analyzer", self.security_analyzer.analyze_security, main_code, language, ["owasp_top_10"]))
+        vulnerability_count = len(report.vulnerabilities)
+        
+        display_content = SECURITY_ANALYSIS_DISPLAY.format(
+            overall_score=report.overall_score,
+            vulnerability_count=vulnerability_count
+        )
+        
+        return {
+            "agent_name": "SecurityAnalyzer",
+            "step_type": "security_analysis", 
+            "vulnerabilities": report.vulnerabilities,
+            "security_score": report.score,
+            "recommendations": report.recommendations,
+            "summary": f"Found {vulnerability_count} security issues",
+            "display_content": display_content
+        }    
+    async def _run_test_generation_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate comprehensive tests"""
+        generated_files = context.get("generated_files", {})
+        main_code = generated_files.get("main.py", context.get("code") or "")
+        language = context.get("programming_language", context.get("language", "python"))
+        
+        report = GeneratedTestsReport.from_result(await self._call_agent(
+            "test_generator", self.test_generator.generate_tests, main_code, language, "pytest"))
+        
+        display_content = TEST_GENERATION_DISPLAY.format(coverage=report.overall_coverage)
+        
+        return {
+            "agent_name": "TestGenerator",
+            "step_type": "test_generation",
+            "test_cases": report.test_cases,
+            "coverage": report.coverage,
+            "test_files": report.test_files,
+            "summary": f"Generated {len(report.test_cases)} test cases",
+            "display_content": display_content
+        }    
+    async def _run_documentation_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate comprehensive documentation"""
+        generated_files = context.get("generated_files", {})
+        main_code = generated_files.get("main.py", context.get("code") or "")
+        language = context.get("programming_language", context.get("language", "python"))
+        
+        result = await self._call_agent(
+            "doc_generator", self.doc_generator.generate_docs, main_code, language, "FastAPI Application")
+        
+        display_content = DOCUMENTATION_DISPLAY
+        
+        return {
+            "agent_name": "DocGenerator",
+            "step_type": "documentation",
+            "documentation": result.get("documentation", {}),
+            "api_docs": result.get("api_documentation", {}), 
+            "summary": "Generated comprehensive documentation",
+            "display_content": display_content
+        }    
+    def _run_code_review_step(self, context: Dict[str, Any]) -> Dict[str, Any]:
+        """Perform comprehensive code review (synchronous: it makes no agent calls)"""
+        security_score = context.get("security_score", {})
+        test_coverage = context.get("coverage", {})
+        
+        overall_score = 85
+        
+        display_content = CODE_REVIEW_DISPLAY.format(overall_score=overall_score)
         
         return {
             "agent_name": "CodeReviewer",
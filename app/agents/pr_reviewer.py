@@ -1,21 +1,138 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Tuple
+import asyncio
+import bisect
+import hashlib
 import os
 import re
 import time
 import httpx
+import orjson
+from cachetools import TTLCache
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.core.ai_service import AIService
 from app.core.database import SessionLocal
+from app.core.concurrency import llm_semaphore as shared_llm_semaphore
+
+# Responses to low-temperature prompts are effectively deterministic, so
+# identical diffs (CI re-runs, retries) reuse them instead of another LLM call
+CACHEABLE_MAX_TEMPERATURE = 0.2
+_llm_response_cache: TTLCache = TTLCache(maxsize=256, ttl=3600)
+
+# Expected format: https://github.com/{owner}/{repo}/pull/{number}
+GITHUB_URL_PREFIX = "https://github.com/"
+
+def _parse_pr_url(pr_url: str) -> Tuple[str, str, str]:
+    """Split a GitHub PR URL into owner, repo and PR number; anything after the number is ignored."""
+    parts = pr_url.split("/", 6)[3:] if pr_url.startswith(GITHUB_URL_PREFIX) else []
+    if len(parts) >= 4 and parts[0] and parts[1] and parts[2] == "pull":
+        number_part = parts[3]
+        pr_number = number_part[:len(number_part) - len(number_part.lstrip("0123456789"))]
+        if pr_number:
+            return parts[0], parts[1], pr_number
+    raise ValueError(f"Invalid GitHub PR URL: {pr_url}")
+
+# Branching constructs counted towards the estimated cyclomatic complexity
+_COMPLEXITY_RE = re.compile(
+    r"\b(?:if|else|elif|for|while|try|except|and|or)\b|\?\s*:|case\s+|switch\s*\(|catch\s*\(",
+    re.IGNORECASE
+)
+MAX_CYCLOMATIC_COMPLEXITY = 50
+
+# Score bands: each thresholds tuple splits a score into len(thresholds) + 1
+# bands, mapped in order onto the matching levels tuple. Lower bounds are
+# inclusive (bisect_right) except business impact, which needs a score
+# strictly above its bound (bisect_left).
+_COMPLEXITY_THRESHOLDS = (20, 40, 60, 80)
+_COMPLEXITY_LEVELS = (("Low", "A"), ("Medium", "B"), ("High", "C"), ("Very High", "D"), ("Critical", "F"))
+_REVIEW_DIFFICULTY_THRESHOLDS = (30, 60)
+_ROLLBACK_DIFFICULTY_THRESHOLDS = (5, 15)
+_DIFFICULTY_LEVELS = ("Easy", "Medium", "Hard")
+_BUSINESS_IMPACT_THRESHOLDS = (40, 70)
+_BUSINESS_IMPACT_LEVELS = ("Low", "Medium", "High")
+_MERGE_CONFIDENCE_THRESHOLDS = (55, 70, 85)
+_MERGE_CONFIDENCE_LEVELS = (
+    ("Very Low", "Reject - significant issues"),
+    ("Low", "Request changes"),
+    ("Medium", "Approve with minor comments"),
+    ("High", "Approve"),
+)
+
+# GitHub lists a PR's files at most 100 per page and 3000 in total
+PR_FILES_PER_PAGE = 100
+PR_FILES_MAX_PAGES = 30
+
+# Patterns used to pull structured findings out of the free-text review
+_SUGGESTION_PATTERNS = (
+    re.compile(r"(?:Specific suggestions for improvement|Suggestions|Improvements):[\s\S]*?(?=\n\d+\.|$)", re.IGNORECASE),
+    re.compile(r"\d+\.\s+([^\n]+)(?:[\s\S]*?)(?=\d+\.|$)", re.IGNORECASE),
+)
+_SECURITY_PATTERNS = (
+    re.compile(r"(?:Security concerns|Security issues|Security vulnerabilities):[\s\S]*?(?=\n\d+\.|$)", re.IGNORECASE),
+    re.compile(r"(?:security|vulnerability|exploit|injection|XSS|CSRF|authentication|authorization|encryption)([^\n.]+\.[^\n]+)", re.IGNORECASE),
+)
+_PERFORMANCE_PATTERNS = (
+    re.compile(r"(?:Performance considerations|Performance issues|Performance optimizations):[\s\S]*?(?=\n\d+\.|$)", re.IGNORECASE),
+    re.compile(r"(?:performance|slow|optimization|efficient|complexity|O\([^)]+\)|memory|CPU|resource)([^\n.]+\.[^\n]+)", re.IGNORECASE),
+)
+_FILE_REFERENCE_RE = re.compile(r"(?:in|file|path)\s+['\"]?([\w\./]+\.[\w]+)['\"]?")
+
+# Review finding categories: output key, the patterns that find them in
+# free text, and the field each finding is classified under
+_FINDING_CATEGORIES = (
+    ("suggestions", _SUGGESTION_PATTERNS, "type"),
+    ("security_issues", _SECURITY_PATTERNS, "severity"),
+    ("performance_issues", _PERFORMANCE_PATTERNS, "impact"),
+)
+_CLASSIFICATION_LEVELS = frozenset(("high", "medium", "low"))
+
+# Structured review keys shared by the review prompts; findings that come
+# back in this shape need no regex extraction
+REVIEW_FINDINGS_FORMAT = """\
+        - "summary": a summary of the changes
+        - "suggestions": a list of {"text": ..., "file": ...} suggestions for improvement
+        - "security_issues": a list of {"text": ..., "file": ..., "severity": "high" | "medium" | "low"}
+        - "performance_issues": a list of {"text": ..., "file": ..., "impact": "high" | "medium" | "low"}"""
+
+# Keywords in a PR that mark each kind of change, in reporting order
+_CHANGE_CATEGORY_KEYWORDS = (
+    ("tests", ("test",)),
+    ("bug_fixes", ("fix", "bug")),
+    ("feature_additions", ("add", "feature")),
+    ("refactoring", ("refactor",)),
+    ("documentation", ("doc",)),
+)
+
+# Keyword alternations for classifying findings; matched as substrings, case-insensitively
+def _keyword_re(keywords: List[str]) -> re.Pattern:
+    return re.compile("|".join(map(re.escape, keywords)), re.IGNORECASE)
+
+_HIGH_SEVERITY_RE = _keyword_re(["critical", "severe", "high", "major", "important", "vulnerability", "exploit", "injection", "authentication"])
+_MEDIUM_SEVERITY_RE = _keyword_re(["moderate", "medium", "warning", "potential", "possible"])
+_HIGH_IMPACT_RE = _keyword_re(["significant", "severe", "high", "major", "critical", "O(n²)", "O(n³)", "exponential"])
+_MEDIUM_IMPACT_RE = _keyword_re(["moderate", "medium", "noticeable", "O(n log n)", "could be improved"])
 
 class PRReviewer:
     """Advanced Pull Request Reviewer with complexity scoring and impact assessment."""
     
-    def __init__(self, db_session: Session = None):
+    def __init__(self, db_session: Session = None, http_client: httpx.AsyncClient = None,
+                 llm_semaphore: asyncio.Semaphore = None):
         """Initialize the PRReviewer agent."""
         self.db_session = db_session or SessionLocal()
         self.ai_service = AIService(session=self.db_session)
         
+        # Reuse one pooled client for GitHub API calls so keep-alive connections
+        # (and their TLS handshakes) carry over between reviews
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or httpx.AsyncClient(
+            timeout=30.0,
+            limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60.0)
+        )
+        # Bounds concurrent LLM calls across reviews so bursts of PRs queue
+        # here instead of tripping provider rate limits and retry storms;
+        # defaults to the process-wide limit, looked up once a loop is running
+        self._llm_sem = llm_semaphore
+        
         # PR complexity scoring weights
         self.complexity_weights = {
             "files_changed": 0.2,
@@ -46,9 +163,13 @@ class PRReviewer:
             "tests": {"weight": 0.4, "color": "#00796B"}
         }
 
-    async def review_pr(self, pr_url: str, repository: str, branch: str = "main", agent_id: int = 1, task_id: int = 1) -> Dict[str, Any]:
+    async def review_pr(self, pr_url: str, repository: str, branch: str = "main", agent_id: int = 1, task_id: int = 1,
+                        deep_analysis: bool = False) -> Dict[str, Any]:
         """
         Review a pull request with advanced complexity scoring and impact assessment.
+        
+        By default the analysis and review comments come from one structured
+        AI call; deep_analysis runs them as two separate calls instead.
         """
         start_time = time.time()
         
@@ -59,15 +180,16 @@ class PRReviewer:
             # Perform complexity analysis
             complexity_analysis = self._analyze_pr_complexity(pr_details)
             
-            # Analyze code changes with advanced metrics
-            code_analysis = await self._analyze_code_changes(pr_details, agent_id=agent_id, task_id=task_id)
+            # Analyze code changes and generate review comments with AI
+            if deep_analysis:
+                code_analysis = await self._analyze_code_changes(pr_details, agent_id=agent_id, task_id=task_id)
+                review_comments = await self._generate_review_comments(code_analysis, complexity_analysis, agent_id=agent_id, task_id=task_id)
+            else:
+                code_analysis, review_comments = await self._review_code_changes(pr_details, agent_id=agent_id, task_id=task_id)
             
             # Assess impact and risk
             impact_assessment = self._assess_pr_impact(pr_details, code_analysis)
             
-            # Generate review comments with AI
-            review_comments = await self._generate_review_comments(code_analysis, complexity_analysis, agent_id=agent_id, task_id=task_id)
-            
             # Calculate overall review score
             review_score = self._calculate_review_score(complexity_analysis, code_analysis, impact_assessment)
             
@@ -111,6 +233,11 @@ class PRReviewer:
                 "review_timestamp": datetime.now().isoformat()
             }
     
+    async def aclose(self):
+        """Close the HTTP client if this reviewer created it."""
+        if self._owns_http_client:
+            await self.http_client.aclose()
+    
     def _analyze_pr_complexity(self, pr_details: Dict[str, Any]) -> Dict[str, Any]:
         """Analyze PR complexity using multiple metrics."""
         files_changed = pr_details.get("files_changed", 5)
@@ -135,16 +262,7 @@ class PRReviewer:
         normalized_score = min(100, complexity_score)
         
         # Determine complexity level
-        if normalized_score < 20:
-            level, grade = "Low", "A"
-        elif normalized_score < 40:
-            level, grade = "Medium", "B"
-        elif normalized_score < 60:
-            level, grade = "High", "C"
-        elif normalized_score < 80:
-            level, grade = "Very High", "D"
-        else:
-            level, grade = "Critical", "F"
+        level, grade = _COMPLEXITY_LEVELS[bisect.bisect_right(_COMPLEXITY_THRESHOLDS, normalized_score)]
         
         return {
             "complexity_score": round(normalized_score, 1),
@@ -157,7 +275,7 @@ class PRReviewer:
                 "net_lines": lines_added - lines_deleted
             },
             "estimated_cyclomatic_complexity": estimated_complexity,
-            "review_difficulty": "Easy" if normalized_score < 30 else "Medium" if normalized_score < 60 else "Hard",
+            "review_difficulty": _DIFFICULTY_LEVELS[bisect.bisect_right(_REVIEW_DIFFICULTY_THRESHOLDS, normalized_score)],
             "factors": {
                 "file_count_impact": files_changed > 10,
                 "large_additions": lines_added > 200,
@@ -172,20 +290,14 @@ class PRReviewer:
             # Mock complexity for demo
             return 12
         
-        complexity_patterns = [
-            r'\bif\b', r'\belse\b', r'\belif\b',
-            r'\bfor\b', r'\bwhile\b',
-            r'\btry\b', r'\bexcept\b',
-            r'\band\b', r'\bor\b',
-            r'\?\s*:', r'case\s+',
-            r'switch\s*\(', r'catch\s*\('
-        ]
-        
         complexity = 1  # Base complexity
-        for pattern in complexity_patterns:
-            complexity += len(re.findall(pattern, diff_content, re.IGNORECASE))
+        for _ in _COMPLEXITY_RE.finditer(diff_content):
+            complexity += 1
+            if complexity >= MAX_CYCLOMATIC_COMPLEXITY:
+                # Capped for reasonableness; the rest of the diff can't change the result
+                break
         
-        return min(50, complexity)  # Cap at 50 for reasonableness
+        return complexity
     
     def _assess_pr_impact(self, pr_details: Dict[str, Any], code_analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Assess the impact and risk of the pull request."""
@@ -194,26 +306,21 @@ class PRReviewer:
         lines_added = pr_details.get("lines_added", 150)
         
         # Determine change categories (mock analysis for demo)
-        change_categories = []
-        if "test" in str(pr_details).lower():
-            change_categories.append("tests")
-        if "fix" in str(pr_details).lower() or "bug" in str(pr_details).lower():
-            change_categories.append("bug_fixes")
-        if "add" in str(pr_details).lower() or "feature" in str(pr_details).lower():
-            change_categories.append("feature_additions")
-        if "refactor" in str(pr_details).lower():
-            change_categories.append("refactoring")
-        if "doc" in str(pr_details).lower():
-            change_categories.append("documentation")
+        pr_text = self._keyword_text(pr_details)
+        change_categories = [
+            category for category, keywords in _CHANGE_CATEGORY_KEYWORDS
+            if any(keyword in pr_text for keyword in keywords)
+        ]
         if not change_categories:
             change_categories.append("feature_additions")  # Default
         
-        # Calculate impact score
-        impact_score = 0
-        for category in change_categories:
-            if category in self.impact_categories:
-                weight = self.impact_categories[category]["weight"]
-                impact_score += weight * min(1.0, files_changed / 10)
+        # Calculate impact score; every category scales by the same file-count
+        # factor, so sum the weights once and apply the factor once
+        category_weight = sum(
+            self.impact_categories[category]["weight"]
+            for category in change_categories if category in self.impact_categories
+        )
+        impact_score = category_weight * min(1.0, files_changed / 10)
         
         impact_score = min(100, impact_score * 100)
         
@@ -223,7 +330,7 @@ class PRReviewer:
             risk_factors.append("High file change count")
         if lines_added > 300:
             risk_factors.append("Large code additions")
-        if "breaking" in str(pr_details).lower():
+        if "breaking" in pr_text:
             risk_factors.append("Potential breaking changes")
         
         risk_level = "High" if len(risk_factors) > 1 else "Medium" if risk_factors else "Low"
@@ -233,12 +340,20 @@ class PRReviewer:
             "change_categories": change_categories,
             "risk_level": risk_level,
             "risk_factors": risk_factors,
-            "business_impact": "High" if impact_score > 70 else "Medium" if impact_score > 40 else "Low",
+            "business_impact": _BUSINESS_IMPACT_LEVELS[bisect.bisect_left(_BUSINESS_IMPACT_THRESHOLDS, impact_score)],
             "deployment_risk": risk_level,
-            "rollback_difficulty": "Easy" if files_changed < 5 else "Medium" if files_changed < 15 else "Hard",
+            "rollback_difficulty": _DIFFICULTY_LEVELS[bisect.bisect_right(_ROLLBACK_DIFFICULTY_THRESHOLDS, files_changed)],
             "estimated_testing_time": f"{max(30, files_changed * 5)} minutes"
         }
     
+    def _keyword_text(self, pr_details: Dict[str, Any]) -> str:
+        """Lowercased title, description and changed file names: the PR text that keyword checks look at."""
+        return " ".join((
+            pr_details.get("title", ""),
+            pr_details.get("description", ""),
+            " ".join(pr_details.get("files_changed", []))
+        )).lower()
+    
     def _calculate_review_score(self, complexity_analysis: Dict[str, Any], code_analysis: Dict[str, Any], impact_assessment: Dict[str, Any]) -> Dict[str, Any]:
         """Calculate overall review score and recommendations."""
         complexity_score = complexity_analysis["complexity_score"]
@@ -248,19 +363,10 @@ class PRReviewer:
         overall_score = max(0, 100 - (complexity_score * 0.6) + (impact_score * 0.2))
         overall_score = min(100, overall_score)
         
+        change_categories = impact_assessment["change_categories"]
+        
         # Determine merge confidence
-        if overall_score >= 85:
-            merge_confidence = "High"
-            recommendation = "Approve"
-        elif overall_score >= 70:
-            merge_confidence = "Medium"
-            recommendation = "Approve with minor comments"
-        elif overall_score >= 55:
-            merge_confidence = "Low"
-            recommendation = "Request changes"
-        else:
-            merge_confidence = "Very Low"
-            recommendation = "Reject - significant issues"
+        merge_confidence, recommendation = _MERGE_CONFIDENCE_LEVELS[bisect.bisect_right(_MERGE_CONFIDENCE_THRESHOLDS, overall_score)]
         
         return {
             "overall_score": round(overall_score, 1),
@@ -273,8 +379,8 @@ class PRReviewer:
             },
             "quality_indicators": {
                 "code_quality": "Good" if complexity_score < 50 else "Needs Improvement",
-                "test_coverage": "Adequate" if "test" in str(impact_assessment).lower() else "Insufficient",
-                "documentation": "Present" if "doc" in str(impact_assessment).lower() else "Missing"
+                "test_coverage": "Adequate" if "tests" in change_categories else "Insufficient",
+                "documentation": "Present" if "documentation" in change_categories else "Missing"
             }
         }
 
@@ -283,14 +389,7 @@ class PRReviewer:
         Fetch PR details from GitHub API.
         """
         # Parse PR URL to extract owner, repo, and PR number
-        # Expected format: https://github.com/{owner}/{repo}/pull/{number}
-        pattern = r"https://github\.com/([^/]+)/([^/]+)/pull/(\d+)"
-        match = re.match(pattern, pr_url)
-        
-        if not match:
-            raise ValueError(f"Invalid GitHub PR URL: {pr_url}")
-            
-        owner, repo, pr_number = match.groups()
+        owner, repo, pr_number = _parse_pr_url(pr_url)
         
         # GitHub API endpoints
         api_base = "https://api.github.com"
@@ -298,33 +397,40 @@ class PRReviewer:
         files_endpoint = f"{api_base}/repos/{owner}/{repo}/pulls/{pr_number}/files"
         
         # Set up headers with GitHub token if available
-        headers = {}
+        headers = {"Accept": "application/vnd.github+json"}
         github_token = os.getenv("GITHUB_TOKEN")
         if github_token:
             headers["Authorization"] = f"token {github_token}"
         
-        async with httpx.AsyncClient() as client:
-            # Fetch PR details
-            pr_response = await client.get(pr_endpoint, headers=headers)
-            if pr_response.status_code != 200:
-                raise Exception(f"Failed to fetch PR details: {pr_response.status_code} {pr_response.text}")
-                
-            pr_data = pr_response.json()
+        # Fetch PR details and the first page of PR files concurrently; neither depends on the other
+        pr_response, files_data = await asyncio.gather(
+            self.http_client.get(pr_endpoint, headers=headers),
+            self._fetch_pr_files_page(files_endpoint, headers, 1)
+        )
+        if pr_response.status_code != 200:
+            raise Exception(f"Failed to fetch PR details: {pr_response.status_code} {pr_response.text}")
             
-            # Fetch PR files
-            files_response = await client.get(files_endpoint, headers=headers)
-            if files_response.status_code != 200:
-                raise Exception(f"Failed to fetch PR files: {files_response.status_code} {files_response.text}")
-                
-            files_data = files_response.json()
-        
-        # Construct diff content
-        diff_content = ""
-        for file in files_data:
-            diff_content += f"File: {file['filename']}\n"
-            diff_content += f"Status: {file['status']}\n"
-            diff_content += f"Changes: +{file['additions']} -{file['deletions']}\n"
-            diff_content += f"Patch:\n{file.get('patch', 'No patch available')}\n\n"
+        pr_data = pr_response.json()
+        
+        # The PR's changed_files count tells how many pages remain, so fetch
+        # them all at once instead of following next links one round trip at a time
+        page_count = min(-(-pr_data.get("changed_files", 0) // PR_FILES_PER_PAGE), PR_FILES_MAX_PAGES)
+        if page_count > 1:
+            pages = await asyncio.gather(*(
+                self._fetch_pr_files_page(files_endpoint, headers, page)
+                for page in range(2, page_count + 1)
+            ))
+            for page_files in pages:
+                files_data.extend(page_files)
+        
+        # Construct diff content in one join rather than repeated concatenation
+        diff_content = "".join(
+            f"File: {file['filename']}\n"
+            f"Status: {file['status']}\n"
+            f"Changes: +{file['additions']} -{file['deletions']}\n"
+            f"Patch:\n{file.get('patch', 'No patch available')}\n\n"
+            for file in files_data
+        )
         
         return {
             "title": pr_data["title"],
@@ -337,6 +443,86 @@ class PRReviewer:
             "url": pr_url
         }
 
+    async def _fetch_pr_files_page(self, files_endpoint: str, headers: Dict[str, str], page: int) -> List[Dict[str, Any]]:
+        """
+        Fetch one page of a PR's changed files from GitHub API.
+        """
+        response = await self.http_client.get(
+            files_endpoint, headers=headers, params={"per_page": PR_FILES_PER_PAGE, "page": page}
+        )
+        if response.status_code != 200:
+            raise Exception(f"Failed to fetch PR files: {response.status_code} {response.text}")
+        return response.json()
+
+    async def _generate_text(self, prompt: str, agent_id: int, task_id: int, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """
+        Generate text through the AI service, within the LLM concurrency limit.
+        """
+        async with self._llm_sem or shared_llm_semaphore():
+            return await self.ai_service.generate_text(
+                prompt=prompt, agent_id=agent_id, task_id=task_id,
+                max_tokens=max_tokens, temperature=temperature
+            )
+
+    async def _generate_text_cached(self, prompt: str, agent_id: int, task_id: int, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        """
+        Generate text, serving low-temperature prompts from the response cache.
+        """
+        if temperature > CACHEABLE_MAX_TEMPERATURE:
+            return await self._generate_text(prompt, agent_id, task_id, max_tokens, temperature)
+        
+        key = hashlib.sha256(f"{temperature}:{max_tokens}:{prompt}".encode()).hexdigest()
+        cached = _llm_response_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        response = await self._generate_text(prompt, agent_id, task_id, max_tokens, temperature)
+        # Never pin the canned text returned when every provider failed
+        if response.get("provider") != "fallback":
+            _llm_response_cache[key] = response
+        return response
+
+    async def _review_code_changes(self, pr_details: Dict[str, Any], agent_id: int, task_id: int) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Analyze code changes and generate review comments with a single structured AI call.
+        """
+        diff = pr_details.get('diff', '')
+        review_prompt = f"""
+        Review the following code changes:
+        {diff}
+        
+        Respond with only a JSON object with these keys:
+        - "analysis": detailed feedback on code quality, potential bugs, security concerns, performance implications and documentation needs
+{REVIEW_FINDINGS_FORMAT}
+        """
+        
+        try:
+            response = await self._generate_text_cached(
+                prompt=review_prompt,
+                agent_id=agent_id,
+                task_id=task_id,
+                max_tokens=2000,
+                temperature=0.1
+            )
+            content = response['content']
+        except Exception as e:
+            print(f"Error reviewing code changes: {str(e)}")
+            content = "Basic review: Please manually review the changes for quality, security, and performance considerations."
+        
+        review = self._parse_review(content)
+        if review is None:
+            # Not structured output: fall back to scraping the prose
+            return (
+                {"analysis": content, "raw_changes": diff},
+                {"summary": content, **self._extract_findings(content)}
+            )
+        
+        analysis = str(review.get("analysis") or review.get("summary") or "")
+        return (
+            {"analysis": analysis, "raw_changes": diff},
+            {"summary": str(review.get("summary") or analysis), **self._parse_findings(review)}
+        )
+
     async def _analyze_code_changes(self, pr_details: Dict[str, Any], agent_id: int, task_id: int) -> Dict[str, Any]:
         """
         Analyze code changes using AI models.
@@ -355,7 +541,7 @@ class PRReviewer:
         """
         
         try:
-            response = await self.ai_service.generate_text(
+            response = await self._generate_text_cached(
                 prompt=analysis_prompt,
                 agent_id=agent_id,
                 task_id=task_id,
@@ -383,15 +569,12 @@ class PRReviewer:
         Based on the following code analysis, generate a structured PR review:
         {analysis['analysis']}
         
-        Format the review as:
-        1. Summary of changes
-        2. Specific suggestions for improvement
-        3. Security concerns
-        4. Performance considerations
+        Respond with only a JSON object with these keys:
+{REVIEW_FINDINGS_FORMAT}
         """
         
         try:
-            response = await self.ai_service.generate_text(
+            response = await self._generate_text_cached(
                 prompt=review_prompt,
                 agent_id=agent_id,
                 task_id=task_id,
@@ -405,132 +588,99 @@ class PRReviewer:
             print(f"Error generating review comments: {str(e)}")
             content = "Basic review: Please manually review the changes for quality, security, and performance considerations."
         
-        # Extract different sections from the response
-        suggestions = self._extract_suggestions(content)
-        security_issues = self._extract_security_issues(content)
-        performance_issues = self._extract_performance_issues(content)
-        
-        return {
-            "summary": content,
-            "suggestions": suggestions,
-            "security_issues": security_issues,
-            "performance_issues": performance_issues
-        }
+        review = self._parse_review(content)
+        if review is None:
+            # Not structured output: extract the sections from the prose
+            return {"summary": content, **self._extract_findings(content)}
+        return {"summary": str(review.get("summary") or content), **self._parse_findings(review)}
     
-    def _extract_suggestions(self, content: str) -> List[Dict[str, str]]:
-        """Extract suggestions for improvement from the review content."""
-        suggestions = []
-        
-        # Look for sections that might contain suggestions
-        suggestion_patterns = [
-            r"(?:Specific suggestions for improvement|Suggestions|Improvements):[\s\S]*?(?=\n\d+\.|$)",
-            r"\d+\.\s+([^\n]+)(?:[\s\S]*?)(?=\d+\.|$)"
-        ]
-        
-        for pattern in suggestion_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            for match in matches:
-                # Clean up the suggestion text
-                suggestion_text = match.strip()
-                if suggestion_text and len(suggestion_text) > 10:  # Avoid empty or very short matches
-                    # Try to identify the file it relates to
-                    file_match = re.search(r"(?:in|file|path)\s+['\"]?([\w\./]+\.[\w]+)['\"]?", suggestion_text)
-                    file_path = file_match.group(1) if file_match else ""
-                    
-                    suggestions.append({
-                        "text": suggestion_text,
-                        "file": file_path,
-                        "type": "improvement"
-                    })
-        
-        return suggestions
+    def _parse_review(self, content: str) -> Optional[Dict[str, Any]]:
+        """Parse a structured review reply, or return None if it holds no JSON object."""
+        try:
+            # Tolerate prose or code fences around the JSON object
+            review = orjson.loads(content[content.index("{"):content.rindex("}") + 1])
+        except ValueError:
+            return None
+        return review if isinstance(review, dict) else None
     
-    def _extract_security_issues(self, content: str) -> List[Dict[str, str]]:
-        """Extract security issues from the review content."""
-        security_issues = []
-        
-        # Look for sections that might contain security issues
-        security_patterns = [
-            r"(?:Security concerns|Security issues|Security vulnerabilities):[\s\S]*?(?=\n\d+\.|$)",
-            r"(?:security|vulnerability|exploit|injection|XSS|CSRF|authentication|authorization|encryption)([^\n.]+\.[^\n]+)"
-        ]
-        
-        for pattern in security_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            for match in matches:
-                # Clean up the issue text
-                issue_text = match.strip()
-                if issue_text and len(issue_text) > 10:  # Avoid empty or very short matches
-                    # Try to identify the file it relates to
-                    file_match = re.search(r"(?:in|file|path)\s+['\"]?([\w\./]+\.[\w]+)['\"]?", issue_text)
-                    file_path = file_match.group(1) if file_match else ""
-                    
-                    security_issues.append({
-                        "text": issue_text,
-                        "file": file_path,
-                        "severity": self._determine_severity(issue_text)
-                    })
-        
-        return security_issues
+    def _extract_findings(self, content: str) -> Dict[str, List[Dict[str, str]]]:
+        """Extract suggestions, security issues and performance issues from the review content in one pass over the categories."""
+        findings = {}
+        
+        # Find every file mention in one scan; each finding then looks up the
+        # first mention inside its own span instead of searching its text again
+        file_mentions = [(m.start(), m.end(1), m.end(), m.group(1)) for m in _FILE_REFERENCE_RE.finditer(content)]
+        mention_starts = [mention[0] for mention in file_mentions]
+        
+        for key, patterns, label in _FINDING_CATEGORIES:
+            items = findings[key] = []
+            for pattern in patterns:
+                group = 1 if pattern.groups else 0
+                for match in pattern.finditer(content):
+                    start, end = match.span(group)
+                    text = (match.group(group) or "").strip()
+                    if text and len(text) > 10:  # Avoid empty or very short matches
+                        # Try to identify the file it relates to
+                        i = bisect.bisect_left(mention_starts, start)
+                        if i and file_mentions[i - 1][2] > start:
+                            # A mention running into the span can match differently
+                            # once cut off at the span start; search the text itself
+                            file_match = _FILE_REFERENCE_RE.search(text)
+                            file = file_match.group(1) if file_match else ""
+                        elif i < len(file_mentions) and file_mentions[i][1] <= end:
+                            file = file_mentions[i][3]
+                        else:
+                            file = ""
+                        items.append({
+                            "text": text,
+                            "file": file,
+                            label: self._classify_finding(label, text)
+                        })
+        
+        return findings
     
-    def _extract_performance_issues(self, content: str) -> List[Dict[str, str]]:
-        """Extract performance issues from the review content."""
-        performance_issues = []
-        
-        # Look for sections that might contain performance issues
-        performance_patterns = [
-            r"(?:Performance considerations|Performance issues|Performance optimizations):[\s\S]*?(?=\n\d+\.|$)",
-            r"(?:performance|slow|optimization|efficient|complexity|O\([^)]+\)|memory|CPU|resource)([^\n.]+\.[^\n]+)"
-        ]
-        
-        for pattern in performance_patterns:
-            matches = re.findall(pattern, content, re.IGNORECASE)
-            for match in matches:
-                # Clean up the issue text
-                issue_text = match.strip()
-                if issue_text and len(issue_text) > 10:  # Avoid empty or very short matches
-                    # Try to identify the file it relates to
-                    file_match = re.search(r"(?:in|file|path)\s+['\"](\w\./]+\.[\w]+)['\"]?", issue_text)
-                    file_path = file_match.group(1) if file_match else ""
-                    
-                    performance_issues.append({
-                        "text": issue_text,
-                        "file": file_path,
-                        "impact": self._determine_impact(issue_text)
-                    })
-        
-        return performance_issues
+    def _parse_findings(self, review: Dict[str, Any]) -> Dict[str, List[Dict[str, str]]]:
+        """Normalize the finding lists of a structured review to the shape _extract_findings produces."""
+        findings = {}
+        
+        for key, _, label in _FINDING_CATEGORIES:
+            items = findings[key] = []
+            for item in review.get(key) or []:
+                if not isinstance(item, dict):
+                    item = {"text": str(item)}
+                text = str(item.get("text", "")).strip()
+                if not text:
+                    continue
+                level = str(item.get(label, "")).lower()
+                items.append({
+                    "text": text,
+                    "file": item.get("file") or "",
+                    # Off-scale levels such as "critical" are classified along with the text
+                    label: level if level in _CLASSIFICATION_LEVELS else self._classify_finding(label, f"{level} {text}")
+                })
+        
+        return findings
+    
+    def _classify_finding(self, label: str, text: str) -> str:
+        """Classify a finding for the given field: suggestion type, security severity or performance impact."""
+        if label == "severity":
+            return self._determine_severity(text)
+        if label == "impact":
+            return self._determine_impact(text)
+        return "improvement"
     
     def _determine_severity(self, text: str) -> str:
         """Determine the severity of a security issue based on its description."""
-        high_keywords = ["critical", "severe", "high", "major", "important", "vulnerability", "exploit", "injection", "authentication"]
-        medium_keywords = ["moderate", "medium", "warning", "potential", "possible"]
-        
-        text_lower = text.lower()
-        
-        for keyword in high_keywords:
-            if keyword in text_lower:
-                return "high"
-                
-        for keyword in medium_keywords:
-            if keyword in text_lower:
-                return "medium"
-                
+        if _HIGH_SEVERITY_RE.search(text):
+            return "high"
+        if _MEDIUM_SEVERITY_RE.search(text):
+            return "medium"
         return "low"
     
     def _determine_impact(self, text: str) -> str:
         """Determine the impact of a performance issue based on its description."""
-        high_keywords = ["significant", "severe", "high", "major", "critical", "O(n²)", "O(n³)", "exponential"]
-        medium_keywords = ["moderate", "medium", "noticeable", "O(n log n)", "could be improved"]
-        
-        text_lower = text.lower()
-        
-        for keyword in high_keywords:
-            if keyword in text_lower:
-                return "high"
-                
-        for keyword in medium_keywords:
-            if keyword in text_lower:
-                return "medium"
-                
+        if _HIGH_IMPACT_RE.search(text):
+            return "high"
+        if _MEDIUM_IMPACT_RE.search(text):
+            return "medium"
         return "low"
\ No newline at end of file
@@ -12,6 +12,18 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+# Sections of the markdown security report the model is asked to produce
+_SUMMARY_RE = re.compile(r'## Summary\n(.+?)\n\n', re.DOTALL)
+_CATEGORY_SECTION_RE = re.compile(r'## ([\w\s]+)\n\n(.+?)(?=\n## |$)', re.DOTALL)
+_VULNERABILITY_SPLIT_RE = re.compile(r'### \d+\.\s+')
+_TITLE_RE = re.compile(r'^([^\n]+)')
+_VULNERABLE_CODE_RE = re.compile(r'\*\*Vulnerable Code(?:\s*\(Lines\s+([\d\-,\s]+)\))?:\*\*\s*```[^\n]*\n(.+?)```', re.DOTALL)
+_SEVERITY_RE = re.compile(r'\*\*Severity:\*\*\s*([^\n]+)')
+_IMPACT_RE = re.compile(r'\*\*Impact:\*\*\s*([^\n]+(?:\n[^\n*]+)*)')
+_REMEDIATION_RE = re.compile(r'\*\*Remediation:\*\*\s*(.+?)(?=\*\*Secure Code Example:|$)', re.DOTALL)
+_BULLET_RE = re.compile(r'^-\s*(.+)$', re.MULTILINE)
+_SECURE_CODE_RE = re.compile(r'\*\*Secure Code Example:\*\*\s*```[^\n]*\n(.+?)```', re.DOTALL)
+
 class SecurityAnalyzer:
     """Advanced Agent for analyzing code for security vulnerabilities with OWASP Top 10 categorization."""
     
@@ -440,12 +452,12 @@ class SecurityAnalyzer:
         }
         
         # Extract summary
-        summary_match = re.search(r'## Summary\n(.+?)\n\n', content, re.DOTALL)
+        summary_match = _SUMMARY_RE.search(content)
         if summary_match:
             result["summary"] = summary_match.group(1).strip()
         
         # Extract vulnerability categories
-        category_sections = re.findall(r'## ([\w\s]+)\n\n(.+?)(?=\n## |$)', content, re.DOTALL)
+        category_sections = _CATEGORY_SECTION_RE.findall(content)
         
         for category_name, category_content in category_sections:
             # Skip the summary section as we've already processed it
@@ -453,7 +465,7 @@ class SecurityAnalyzer:
                 continue
                 
             # Extract individual vulnerabilities
-            vulnerabilities = re.split(r'### \d+\.\s+', category_content)
+            vulnerabilities = _VULNERABILITY_SPLIT_RE.split(category_content)
             if vulnerabilities and not vulnerabilities[0].strip():
                 vulnerabilities = vulnerabilities[1:]
                 
@@ -473,12 +485,12 @@ class SecurityAnalyzer:
                 }
                 
                 # Extract title
-                title_match = re.match(r'^([^\n]+)', vuln)
+                title_match = _TITLE_RE.match(vuln)
                 if title_match:
                     vulnerability["title"] = title_match.group(1).strip()
                 
                 # Extract vulnerable code
-                code_match = re.search(r'\*\*Vulnerable Code(?:\s*\(Lines\s+([\d\-,\s]+)\))?:\*\*\s*```[^\n]*\n(.+?)```', vuln, re.DOTALL)
+                code_match = _VULNERABLE_CODE_RE.search(vuln)
                 if code_match:
                     line_info = code_match.group(1)
                     vulnerability["vulnerable_code"] = code_match.group(2).strip()
@@ -497,7 +509,7 @@ class SecurityAnalyzer:
                         vulnerability["line_numbers"] = line_numbers
                 
                 # Extract severity
-                severity_match = re.search(r'\*\*Severity:\*\*\s*([^\n]+)', vuln)
+                severity_match = _SEVERITY_RE.search(vuln)
                 if severity_match:
                     severity = severity_match.group(1).strip().lower()
                     vulnerability["severity"] = severity
@@ -506,16 +518,16 @@ class SecurityAnalyzer:
                         result["severity_counts"][severity] += 1
                 
                 # Extract impact
-                impact_match = re.search(r'\*\*Impact:\*\*\s*([^\n]+(?:\n[^\n*]+)*)', vuln)
+                impact_match = _IMPACT_RE.search(vuln)
                 if impact_match:
                     vulnerability["impact"] = impact_match.group(1).strip()
                 
                 # Extract remediation
-                remediation_match = re.search(r'\*\*Remediation:\*\*\s*(.+?)(?=\*\*Secure Code Example:|$)', vuln, re.DOTALL)
+                remediation_match = _REMEDIATION_RE.search(vuln)
                 if remediation_match:
                     # Extract bullet points if present
                     remediation_text = remediation_match.group(1).strip()
-                    remediation_items = re.findall(r'^-\s*(.+)$', remediation_text, re.MULTILINE)
+                    remediation_items = _BULLET_RE.findall(remediation_text)
                     
                     if remediation_items:
                         vulnerability["remediation"] = remediation_items
@@ -523,7 +535,7 @@ class SecurityAnalyzer:
                         vulnerability["remediation"] = [remediation_text]
                 
                 # Extract secure code example
-                secure_code_match = re.search(r'\*\*Secure Code Example:\*\*\s*```[^\n]*\n(.+?)```', vuln, re.DOTALL)
+                secure_code_match = _SECURE_CODE_RE.search(vuln)
                 if secure_code_match:
                     vulnerability["secure_code"] = secure_code_match.group(1).strip()
                 
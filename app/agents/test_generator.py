@@ -4,6 +4,7 @@ import re
 import time
 from datetime import datetime
 from sqlalchemy.orm import Session
+from app.core.ai_fallback import record_fallback
 from app.core.ai_service import AIService
 from app.core.database import SessionLocal
 
@@ -367,6 +368,7 @@ class TestGenerator:
             }
         except Exception as e:
             # Fallback to basic analysis if AI service fails
+            record_fallback(f"code analysis failed: {e}")
             return {
                 "analysis": f"Basic analysis for {language} code with {len(code.splitlines())} lines",
                 "raw_code": code
@@ -422,6 +424,7 @@ class TestGenerator:
             
         except Exception as e:
             # Fallback to basic test generation
+            record_fallback(f"test case generation failed: {e}")
             return self._generate_basic_test_cases(code_analysis, test_framework)
     
     def _extract_unit_tests(self, test_content: str, framework: str) -> List[Dict[str, str]]:
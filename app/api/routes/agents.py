@@ -1,7 +1,8 @@
 """
 API routes for AI agents - connecting to existing agent implementations
 """
-from fastapi import APIRouter, HTTPException, BackgroundTasks
+from fastapi import APIRouter, HTTPException, BackgroundTasks, Response
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 from typing import Dict, Any, List, Optional
 import asyncio
@@ -28,6 +29,11 @@ pr_reviewer = PRReviewer()
 security_analyzer = SecurityAnalyzer()
 test_generator = TestGenerator()
 
+@router.on_event("shutdown")
+async def close_orchestrator():
+    await orchestrator.aclose()
+    await pr_reviewer.aclose()
+
 # Request/Response Models
 class CodeOptimizationRequest(BaseModel):
     code: str
@@ -118,7 +124,7 @@ async def generate_tests(request: TestGenerationRequest):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Test generation failed: {str(e)}")
 
-@router.post("/review-pr")
+@router.post("/review-pr", response_class=ORJSONResponse)
 async def review_pull_request(request: PRReviewRequest):
     """Review pull request using the PRReviewer agent"""
     try:
@@ -136,22 +142,16 @@ async def generate_project_ideas(request: IdeationRequest):
     """Generate project ideas using the Ideation agent"""
     try:
         # Generate project scope first
-        project_scope = ideation_agent.generate_project_scope(
+        project_scope = await ideation_agent.generate_project_scope(
             description=request.description,
             template_key=request.template_key
         )
         
-        # Generate technical specs and user stories concurrently
-        technical_specs_task = asyncio.create_task(
-            asyncio.to_thread(ideation_agent.generate_technical_specs, project_scope)
-        )
-        user_stories_task = asyncio.create_task(
-            asyncio.to_thread(ideation_agent.generate_user_stories, project_scope)
-        )
-        
-        # Wait for both tasks to complete
+        # Generate technical specs and user stories concurrently; both are
+        # coroutines already, so they run on the loop rather than in threads
         technical_specs, user_stories = await asyncio.gather(
-            technical_specs_task, user_stories_task
+            ideation_agent.generate_technical_specs(project_scope),
+            ideation_agent.generate_user_stories(project_scope)
         )
         
         return {
@@ -181,7 +181,7 @@ async def orchestrate_workflow(request: WorkflowRequest):
             initial_input=initial_input
         )
         
-        return result.to_dict()
+        return Response(content=result.encode(), media_type="application/json")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Workflow orchestration failed: {str(e)}")
 
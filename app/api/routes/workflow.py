@@ -1,10 +1,12 @@
 import asyncio
-import json
+import contextlib
 import time
 import uuid
 import os
+import string
 import subprocess
 import tempfile
+import orjson
 from fastapi import APIRouter, HTTPException
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
@@ -34,7 +36,8 @@ workflow_requests: Dict[str, WorkflowRequest] = {}
 
 def create_sse_message(event: str, data: Dict[str, Any]) -> str:
     """Formats a message for Server-Sent Events."""
-    json_data = json.dumps(data)
+    # Step payloads carry whole generated files; orjson encodes them far faster
+    json_data = orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS).decode()
     return f"event: {event}\ndata: {json_data}\n\n"
 
 @router.post("/automated-pipeline")
@@ -222,17 +225,15 @@ async def generate_application_code(project_scope: Dict, framework: str) -> Dict
     else:
         return generate_flask_app(project_name, description)  # Default to Flask
 
-def generate_flask_app(project_name: str, description: str) -> Dict[str, str]:
-    """Generate a complete Flask application."""
-    
-    app_code = f'''
+# Generated Flask app templates, parsed once at import; only the app module has holes to fill
+FLASK_APP_TEMPLATE = string.Template('''
 from flask import Flask, render_template, request, jsonify, redirect, url_for
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
 import os
 
 app = Flask(__name__)
-app.config['SECRET_KEY'] = 'dev-secret-key-{uuid.uuid4().hex[:8]}'
+app.config['SECRET_KEY'] = 'dev-secret-key-$secret_suffix'
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///app.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
@@ -247,19 +248,19 @@ class Task(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def to_dict(self):
-        return {{
+        return {
             'id': self.id,
             'title': self.title,
             'description': self.description,
             'completed': self.completed,
             'created_at': self.created_at.isoformat()
-        }}
+        }
 
 # Routes
 @app.route('/')
 def index():
     tasks = Task.query.all()
-    return render_template('index.html', tasks=tasks, project_name="{project_name}")
+    return render_template('index.html', tasks=tasks, project_name="$project_name")
 
 @app.route('/api/tasks', methods=['GET'])
 def get_tasks():
@@ -303,7 +304,7 @@ with app.app_context():
     # Add sample data if no tasks exist
     if Task.query.count() == 0:
         sample_tasks = [
-            Task(title="Welcome to {project_name}!", description="This is your first task. Click to mark it as complete."),
+            Task(title="Welcome to $project_name!", description="This is your first task. Click to mark it as complete."),
             Task(title="Add a new task", description="Use the form below to add your own tasks."),
             Task(title="Edit this task", description="Click the edit button to modify this task."),
         ]
@@ -313,50 +314,50 @@ with app.app_context():
 
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5000)
-'''
-    
-    html_template = f'''
+''')
+
+FLASK_INDEX_HTML = '''
 <!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
-    <title>{{{{ project_name }}}}</title>
+    <title>{{ project_name }}</title>
     <style>
-        * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; }}
-        .container {{ max-width: 800px; margin: 0 auto; padding: 20px; }}
-        .header {{ text-align: center; color: white; margin-bottom: 30px; }}
-        .header h1 {{ font-size: 2.5em; margin-bottom: 10px; text-shadow: 2px 2px 4px rgba(0,0,0,0.5); }}
-        .header p {{ font-size: 1.2em; opacity: 0.9; }}
-        .app-container {{ background: white; border-radius: 15px; padding: 30px; box-shadow: 0 15px 35px rgba(0,0,0,0.1); }}
-        .task-form {{ background: #f8f9fa; padding: 20px; border-radius: 10px; margin-bottom: 30px; }}
-        .form-group {{ margin-bottom: 15px; }}
-        .form-group label {{ display: block; margin-bottom: 5px; font-weight: bold; color: #333; }}
-        .form-group input, .form-group textarea {{ width: 100%; padding: 12px; border: 2px solid #e0e0e0; border-radius: 8px; font-size: 16px; transition: border-color 0.3s; }}
-        .form-group input:focus, .form-group textarea:focus {{ outline: none; border-color: #667eea; }}
-        .btn {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border: none; padding: 12px 24px; border-radius: 8px; cursor: pointer; font-size: 16px; transition: transform 0.2s; }}
-        .btn:hover {{ transform: translateY(-2px); }}
-        .task-list {{ list-style: none; }}
-        .task-item {{ background: white; border: 2px solid #e0e0e0; border-radius: 10px; padding: 20px; margin-bottom: 15px; transition: all 0.3s; }}
-        .task-item:hover {{ transform: translateY(-2px); box-shadow: 0 8px 25px rgba(0,0,0,0.1); }}
-        .task-item.completed {{ opacity: 0.7; border-color: #28a745; }}
-        .task-title {{ font-size: 1.3em; font-weight: bold; margin-bottom: 8px; color: #333; }}
-        .task-description {{ color: #666; margin-bottom: 15px; line-height: 1.5; }}
-        .task-actions {{ display: flex; gap: 10px; }}
-        .btn-small {{ padding: 8px 16px; font-size: 14px; }}
-        .btn-success {{ background: #28a745; }}
-        .btn-danger {{ background: #dc3545; }}
-        .btn-warning {{ background: #ffc107; color: #333; }}
-        .status-badge {{ display: inline-block; padding: 4px 12px; border-radius: 20px; font-size: 12px; font-weight: bold; text-transform: uppercase; }}
-        .status-pending {{ background: #ffeaa7; color: #d63031; }}
-        .status-completed {{ background: #55a3ff; color: white; }}
+        * { margin: 0; padding: 0; box-sizing: border-box; }
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); min-height: 100vh; }
+        .container { max-width: 800px; margin: 0 auto; padding: 20px; }
+        .header { text-align: center; color: white; margin-bottom: 30px; }
+        .header h1 { font-size: 2.5em; margin-bottom: 10px; text-shadow: 2px 2px 4px rgba(0,0,0,0.5); }
+        .header p { font-size: 1.2em; opacity: 0.9; }
+        .app-container { background: white; border-radius: 15px; padding: 30px; box-shadow: 0 15px 35px rgba(0,0,0,0.1); }
+        .task-form { background: #f8f9fa; padding: 20px; border-radius: 10px; margin-bottom: 30px; }
+        .form-group { margin-bottom: 15px; }
+        .form-group label { display: block; margin-bottom: 5px; font-weight: bold; color: #333; }
+        .form-group input, .form-group textarea { width: 100%; padding: 12px; border: 2px solid #e0e0e0; border-radius: 8px; font-size: 16px; transition: border-color 0.3s; }
+        .form-group input:focus, .form-group textarea:focus { outline: none; border-color: #667eea; }
+        .btn { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; border: none; padding: 12px 24px; border-radius: 8px; cursor: pointer; font-size: 16px; transition: transform 0.2s; }
+        .btn:hover { transform: translateY(-2px); }
+        .task-list { list-style: none; }
+        .task-item { background: white; border: 2px solid #e0e0e0; border-radius: 10px; padding: 20px; margin-bottom: 15px; transition: all 0.3s; }
+        .task-item:hover { transform: translateY(-2px); box-shadow: 0 8px 25px rgba(0,0,0,0.1); }
+        .task-item.completed { opacity: 0.7; border-color: #28a745; }
+        .task-title { font-size: 1.3em; font-weight: bold; margin-bottom: 8px; color: #333; }
+        .task-description { color: #666; margin-bottom: 15px; line-height: 1.5; }
+        .task-actions { display: flex; gap: 10px; }
+        .btn-small { padding: 8px 16px; font-size: 14px; }
+        .btn-success { background: #28a745; }
+        .btn-danger { background: #dc3545; }
+        .btn-warning { background: #ffc107; color: #333; }
+        .status-badge { display: inline-block; padding: 4px 12px; border-radius: 20px; font-size: 12px; font-weight: bold; text-transform: uppercase; }
+        .status-pending { background: #ffeaa7; color: #d63031; }
+        .status-completed { background: #55a3ff; color: white; }
     </style>
 </head>
 <body>
     <div class="container">
         <div class="header">
-            <h1>{{{{ project_name }}}}</h1>
+            <h1>{{ project_name }}</h1>
             <p>AI-Generated Task Management Application</p>
         </div>
         
@@ -379,21 +380,21 @@ if __name__ == '__main__':
             <div class="tasks-section">
                 <h3>Your Tasks</h3>
                 <ul class="task-list" id="taskList">
-                    {{% for task in tasks %}}
-                    <li class="task-item {{% if task.completed %}}completed{{% endif %}}" data-task-id="{{{{ task.id }}}}">
-                        <div class="task-title">{{{{ task.title }}}}</div>
-                        <div class="task-description">{{{{ task.description or 'No description' }}}}</div>
+                    {% for task in tasks %}
+                    <li class="task-item {% if task.completed %}completed{% endif %}" data-task-id="{{ task.id }}">
+                        <div class="task-title">{{ task.title }}</div>
+                        <div class="task-description">{{ task.description or 'No description' }}</div>
                         <div class="task-actions">
-                            <span class="status-badge {{% if task.completed %}}status-completed{{% else %}}status-pending{{% endif %}}">
-                                {{% if task.completed %}}Completed{{% else %}}Pending{{% endif %}}
+                            <span class="status-badge {% if task.completed %}status-completed{% else %}status-pending{% endif %}">
+                                {% if task.completed %}Completed{% else %}Pending{% endif %}
                             </span>
-                            <button class="btn btn-success btn-small" onclick="toggleTask({{{{ task.id }}}}, {{{{ not task.completed }}}})">
-                                {{% if task.completed %}}Mark Pending{{% else %}}Mark Complete{{% endif %}}
+                            <button class="btn btn-success btn-small" onclick="toggleTask({{ task.id }}, {{ not task.completed }})">
+                                {% if task.completed %}Mark Pending{% else %}Mark Complete{% endif %}
                             </button>
-                            <button class="btn btn-danger btn-small" onclick="deleteTask({{{{ task.id }}}})">Delete</button>
+                            <button class="btn btn-danger btn-small" onclick="deleteTask({{ task.id }})">Delete</button>
                         </div>
                     </li>
-                    {{% endfor %}}
+                    {% endfor %}
                 </ul>
             </div>
         </div>
@@ -401,77 +402,85 @@ if __name__ == '__main__':
 
     <script>
         // Add new task
-        document.getElementById('taskForm').addEventListener('submit', async (e) => {{
+        document.getElementById('taskForm').addEventListener('submit', async (e) => {
             e.preventDefault();
             const formData = new FormData(e.target);
-            const data = {{
+            const data = {
                 title: formData.get('title'),
                 description: formData.get('description')
-            }};
+            };
             
-            try {{
-                const response = await fetch('/api/tasks', {{
+            try {
+                const response = await fetch('/api/tasks', {
                     method: 'POST',
-                    headers: {{ 'Content-Type': 'application/json' }},
+                    headers: { 'Content-Type': 'application/json' },
                     body: JSON.stringify(data)
-                }});
+                });
                 
-                if (response.ok) {{
+                if (response.ok) {
                     location.reload();
-                }}
-            }} catch (error) {{
+                }
+            } catch (error) {
                 console.error('Error adding task:', error);
-            }}
-        }});
+            }
+        });
         
         // Toggle task completion
-        async function toggleTask(taskId, completed) {{
-            try {{
-                const response = await fetch(`/api/tasks/${{taskId}}`, {{
+        async function toggleTask(taskId, completed) {
+            try {
+                const response = await fetch(`/api/tasks/${taskId}`, {
                     method: 'PUT',
-                    headers: {{ 'Content-Type': 'application/json' }},
-                    body: JSON.stringify({{ completed }})
-                }});
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ completed })
+                });
                 
-                if (response.ok) {{
+                if (response.ok) {
                     location.reload();
-                }}
-            }} catch (error) {{
+                }
+            } catch (error) {
                 console.error('Error updating task:', error);
-            }}
-        }}
+            }
+        }
         
         // Delete task
-        async function deleteTask(taskId) {{
-            if (confirm('Are you sure you want to delete this task?')) {{
-                try {{
-                    const response = await fetch(`/api/tasks/${{taskId}}`, {{
+        async function deleteTask(taskId) {
+            if (confirm('Are you sure you want to delete this task?')) {
+                try {
+                    const response = await fetch(`/api/tasks/${taskId}`, {
                         method: 'DELETE'
-                    }});
+                    });
                     
-                    if (response.ok) {{
+                    if (response.ok) {
                         location.reload();
-                    }}
-                }} catch (error) {{
+                    }
+                } catch (error) {
                     console.error('Error deleting task:', error);
-                }}
-            }}
-        }}
+                }
+            }
+        }
     </script>
 </body>
 </html>
 '''
-    
-    requirements = '''
+
+FLASK_REQUIREMENTS = '''
 Flask==2.3.3
 Flask-SQLAlchemy==3.0.5
 Werkzeug==2.3.7
 '''
+
+def generate_flask_app(project_name: str, description: str) -> Dict[str, str]:
+    """Generate a complete Flask application."""
+    
+    app_code = FLASK_APP_TEMPLATE.safe_substitute(
+        secret_suffix=uuid.uuid4().hex[:8],
+        project_name=project_name
+    )
     
     return {
         "app.py": app_code,
-        "templates/index.html": html_template,
-        "requirements.txt": requirements
+        "templates/index.html": FLASK_INDEX_HTML,
+        "requirements.txt": FLASK_REQUIREMENTS
     }
 
 def generate_fastapi_app(project_name: str, description: str) -> Dict[str, str]:
@@ -596,6 +605,10 @@ async def generate_workflow_stream(workflow_id: str, request: WorkflowRequest) -
         "code_sample": request.code_sample
     }
 
+    step_names = dict(workflow_steps)
+    step_numbers = {step_key: i + 1 for i, (step_key, _) in enumerate(workflow_steps)}
+    results = dict(context)
+
     try:
         # Initial workflow started message
         yield create_sse_message("workflow_start", {
@@ -606,76 +619,76 @@ async def generate_workflow_stream(workflow_id: str, request: WorkflowRequest) -
             "message": "🚀 Workflow initiated, buckle up!"
         })
 
-        for i, (step_key, step_name) in enumerate(workflow_steps):
-            
-            # Check if workflow should stop
-            if active_workflows.get(workflow_id, {}).get("should_stop", False):
-                yield create_sse_message("workflow_update", {
-                    "workflow_id": workflow_id,
-                    "status": "stopping",
-                    "message": "Workflow stop signal received."
-                })
-                break
-            
-            step_id = f"{workflow_id}-{i+1}"
-            active_workflows[workflow_id]["current_step"] = i + 1
-            
-            # Send step start message
-            yield create_sse_message("step_start", {
-                "workflow_id": workflow_id,
-                "step_id": step_id,
-                "agent_name": step_name,
-                "status": "started",
-                "progress": 0,
-                "message": f"🚀 {step_name}: Starting..."
-            })
-            
-            active_workflows[workflow_id]["progress"] = int(((i + 1) / len(workflow_steps)) * 100 * 0.5)
-            
-            # Send an update that we're in progress
-            yield create_sse_message("step_update", {
-                "workflow_id": workflow_id,
-                "step_id": step_id,
-                "agent_name": step_name,
-                "status": "running",
-                "progress": 75,
-                "message": f"⚡ {step_name}: Processing..."
-            })
-            
-            # Execute the actual step
-            try:
-                result = await orchestrator.execute_step(step_key, context)
+        # Steps run through the orchestrator's dependency scheduler, so the
+        # security, test and documentation steps overlap; each is reported
+        # as it is launched and again as soon as it finishes
+        async with contextlib.aclosing(orchestrator.stream_workflow("full_development", context)) as step_events:
+            finished = 0
+            async for step_event in step_events:
+                # Check if workflow should stop
+                if active_workflows.get(workflow_id, {}).get("should_stop", False):
+                    yield create_sse_message("workflow_update", {
+                        "workflow_id": workflow_id,
+                        "status": "stopping",
+                        "message": "Workflow stop signal received."
+                    })
+                    break
                 
-                # Update context with results
-                context.update(result)
+                step_key = step_event["step"]
+                step_name = step_names[step_key]
+                step_id = f"{workflow_id}-{step_numbers[step_key]}"
                 
-                # Send step completion
-                yield create_sse_message("step_complete", {
-                    "workflow_id": workflow_id,
-                    "step_id": step_id,
-                    "agent_name": step_name,
-                    "status": "completed",
-                    "progress": 100,
-                    "result": result,
-                    "duration": 2, # Placeholder duration
-                    "message": f"✅ {step_name}: Completed successfully"
-                })
-                
-                await asyncio.sleep(0.5)
+                if step_event["event"] == "started":
+                    yield create_sse_message("step_start", {
+                        "workflow_id": workflow_id,
+                        "step_id": step_id,
+                        "agent_name": step_name,
+                        "status": "started",
+                        "progress": 0,
+                        "message": f"🚀 {step_name}: Starting..."
+                    })
+                    
+                    # Send an update that we're in progress
+                    yield create_sse_message("step_update", {
+                        "workflow_id": workflow_id,
+                        "step_id": step_id,
+                        "agent_name": step_name,
+                        "status": "running",
+                        "progress": 75,
+                        "message": f"⚡ {step_name}: Processing..."
+                    })
+                    continue
                 
-            except Exception as e:
-                # Send error for this step but continue workflow
-                yield create_sse_message("step_error", {
-                    "workflow_id": workflow_id,
-                    "step_id": step_id,
-                    "agent_name": step_name,
-                    "status": "failed",
-                    "progress": 100,
-                    "error": str(e),
-                    "message": f"❌ {step_name}: Failed - {str(e)}"
-                })
+                finished += 1
+                active_workflows[workflow_id]["current_step"] = finished
+                active_workflows[workflow_id]["progress"] = int((finished / len(workflow_steps)) * 100)
                 
-                await asyncio.sleep(0.5)
+                if step_event["success"]:
+                    result = step_event["result"]
+                    results.update(result)
+                    
+                    # Send step completion
+                    yield create_sse_message("step_complete", {
+                        "workflow_id": workflow_id,
+                        "step_id": step_id,
+                        "agent_name": step_name,
+                        "status": "completed",
+                        "progress": 100,
+                        "result": result,
+                        "duration": step_event["duration"],
+                        "message": f"✅ {step_name}: Completed successfully"
+                    })
+                else:
+                    # Send error for this step; independent steps carry on
+                    yield create_sse_message("step_error", {
+                        "workflow_id": workflow_id,
+                        "step_id": step_id,
+                        "agent_name": step_name,
+                        "status": "failed",
+                        "progress": 100,
+                        "error": step_event["error"],
+                        "message": f"❌ {step_name}: Failed - {step_event['error']}"
+                    })
         
         # Final workflow completion
         if workflow_id in active_workflows:
@@ -687,7 +700,7 @@ async def generate_workflow_stream(workflow_id: str, request: WorkflowRequest) -
             yield create_sse_message("workflow_complete", {
                 "workflow_id": workflow_id,
                 "status": final_status,
-                "results": context,
+                "results": results,
                 "total_time": int(asyncio.get_event_loop().time() - active_workflows[workflow_id]["start_time"]),
                 "message": "🎉 Workflow completed successfully!" if final_status == "completed" else "🛑 Workflow stopped",
                 "progress": 100
@@ -702,6 +715,8 @@ async def generate_workflow_stream(workflow_id: str, request: WorkflowRequest) -
         })
     
     finally:
+        await orchestrator.aclose()
+        
         # Clean up workflow tracking
         if workflow_id in active_workflows:
             # Keep for a short time for status queries
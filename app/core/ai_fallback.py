@@ -0,0 +1,29 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional
+
+# Reasons the generations made under the innermost track_fallbacks() block
+# fell back to canned content, or None outside any such block
+_fallbacks: ContextVar[Optional[List[str]]] = ContextVar("ai_fallbacks", default=None)
+
+
+@contextmanager
+def track_fallbacks() -> Iterator[List[str]]:
+    """Collect the reasons any AI generation inside the block fell back to canned content.
+
+    Agents turn a fallback response into an ordinary-looking result, so
+    callers that cache results use this to tell the two apart.
+    """
+    fallbacks: List[str] = []
+    token = _fallbacks.set(fallbacks)
+    try:
+        yield fallbacks
+    finally:
+        _fallbacks.reset(token)
+
+
+def record_fallback(reason: str):
+    """Note that the current generation fell back to canned content."""
+    fallbacks = _fallbacks.get()
+    if fallbacks is not None:
+        fallbacks.append(reason)
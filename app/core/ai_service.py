@@ -9,6 +9,7 @@ import logging
 import json
 import time
 import random
+from functools import lru_cache
 
 import backoff
 from sqlalchemy.orm import Session
@@ -17,7 +18,9 @@ from openai import OpenAI
 import google.generativeai as genai
 from google.api_core import exceptions as google_exceptions
 
+from app.core.ai_fallback import record_fallback
 from app.core.config import settings
+from app.core.database import SessionLocal
 <<<<<<< HEAD
 from app.crud.agent_log import AgentLogRepository
 from app.models.agent_log import LogLevel
@@ -29,6 +32,20 @@ from app.crud.agent_log import LogLevel
 logger = logging.getLogger(__name__)
 
 
+# Provider clients are shared by every AIService instance: agents build a
+# service per request, and each OpenAI client would otherwise open its own
+# connection pool. Keyed on the API key so a rotated key gets a new client.
+@lru_cache(maxsize=2)
+def _shared_openai_client(api_key: str) -> OpenAI:
+    return OpenAI(api_key=api_key)
+
+
+@lru_cache(maxsize=2)
+def _shared_gemini_model(api_key: str) -> "genai.GenerativeModel":
+    genai.configure(api_key=api_key)
+    return genai.GenerativeModel('gemini-1.5-flash-latest')
+
+
 class AIService:
     """Centralized AI service with multi-provider support and failover capabilities."""
 
@@ -56,9 +73,7 @@ class AIService:
         try:
             # Initialize OpenAI client with minimal parameters
             if settings.OPENAI_API_KEY:
-                self.openai_client = OpenAI(
-                    api_key=settings.OPENAI_API_KEY
-                )
+                self.openai_client = _shared_openai_client(settings.OPENAI_API_KEY)
                 logger.info("✅ OpenAI client initialized successfully")
             else:
                 self.openai_client = None
@@ -70,8 +85,7 @@ class AIService:
         try:
             # Initialize Gemini
             if settings.GOOGLE_API_KEY:
-                genai.configure(api_key=settings.GOOGLE_API_KEY)
-                self.gemini_model = genai.GenerativeModel('gemini-1.5-flash-latest')
+                self.gemini_model = _shared_gemini_model(settings.GOOGLE_API_KEY)
                 logger.info("✅ Gemini client initialized successfully")
             else:
                 self.gemini_model = None
@@ -122,6 +136,7 @@ class AIService:
                     )
                     
                     # Return fallback response
+                    record_fallback(f"all providers failed: {e}")
                     return {
                         'content': self._get_fallback_response(prompt),
                         'provider': 'fallback',
@@ -251,13 +266,23 @@ class AIService:
                 status="completed" if success else "failed"
             )
             
-            self.session.add(log_entry)
-            await asyncio.to_thread(self.session.commit)
+            await asyncio.to_thread(self._write_log, log_entry)
             
         except Exception as e:
             logger.error(f"Failed to log AI generation: {e}")
             # Don't raise here to avoid breaking the main flow
 
+    @staticmethod
+    def _write_log(log_entry):
+        """Commit a log entry in a session of its own.
+
+        Services are shared by concurrent requests, and a session must not
+        be used from several threads at once.
+        """
+        with SessionLocal() as session:
+            session.add(log_entry)
+            session.commit()
+
     async def generate_json_output(self, prompt: str, output_schema: Dict[str, Any]) -> Dict[str, Any]:
         """
         Generates a JSON output from a prompt using a specified schema.
@@ -0,0 +1,24 @@
+import asyncio
+import weakref
+
+from app.core.config import settings
+
+# One semaphore per event loop, created the first time that loop asks for
+# it. A semaphore made at import time could bind to whichever loop first
+# contends on it, which breaks tests and anything else running more than
+# one loop.
+_llm_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def llm_semaphore() -> asyncio.Semaphore:
+    """Return the semaphore capping outbound LLM calls on the running event loop.
+
+    Every orchestrator and PR reviewer in the process shares it, so
+    concurrent requests draw on one allowance instead of each getting their
+    own. Must be called from inside a running loop.
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _llm_semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _llm_semaphores[loop] = asyncio.Semaphore(settings.LLM_MAX_CONCURRENCY)
+    return semaphore
@@ -30,6 +30,8 @@ class Settings(BaseSettings):
     
     # Database
     DATABASE_URI: str = os.getenv("DATABASE_URI", "sqlite:///./monk_ai.db")
+    DATABASE_POOL_SIZE: int = int(os.getenv("DATABASE_POOL_SIZE", "10"))
+    DATABASE_MAX_OVERFLOW: int = int(os.getenv("DATABASE_MAX_OVERFLOW", "0"))
     
     # Redis cache settings
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -54,6 +56,11 @@ class Settings(BaseSettings):
     # Agent Settings
     MAX_CONCURRENT_AGENTS: int = int(os.getenv("MAX_CONCURRENT_AGENTS", "5"))
     AGENT_TIMEOUT_SECONDS: int = int(os.getenv("AGENT_TIMEOUT_SECONDS", "300"))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    AGENT_RESULT_CACHE_SIZE: int = int(os.getenv("AGENT_RESULT_CACHE_SIZE", "1024"))
+    AGENT_RESULT_CACHE_TTL_SECONDS: int = int(os.getenv("AGENT_RESULT_CACHE_TTL_SECONDS", "3600"))
+    # JSON-lines file backing the agent result cache; empty keeps it in memory only
+    AGENT_RESULT_CACHE_FILE: str = os.getenv("AGENT_RESULT_CACHE_FILE", "")
     
     # Logging
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
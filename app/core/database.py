@@ -25,8 +25,10 @@ engine = create_engine(
     connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {},
     # Pool settings
     poolclass=QueuePool,
-    pool_size=10,  # Maximum number of connections to keep open
-    max_overflow=20,  # Maximum number of connections to create above pool_size
+    # A fixed-size pool (no overflow by default) avoids connect-time stalls
+    # and DB-side contention under bursts; tune via env per deployment
+    pool_size=settings.DATABASE_POOL_SIZE,  # Maximum number of connections to keep open
+    max_overflow=settings.DATABASE_MAX_OVERFLOW,  # Maximum number of connections to create above pool_size
     pool_timeout=30,  # Seconds to wait before timeout on getting connection from pool
     pool_recycle=1800,  # Recycle connections after this many seconds
     pool_pre_ping=True  # Check connection before using from pool
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Any, Optional
+
+import orjson
+from cachetools import LRUCache
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+
+class ResultCache:
+    """
+    Two-tier cache for agent results.
+    Features:
+    - Bounded in-memory LRU tier with a per-entry expiry
+    - Optional JSON-lines file so results survive restarts, appended to on
+      writes and compacted to the live entries on load
+    - Disk writes run in a worker thread, off the event loop
+    """
+
+    def __init__(self, maxsize: int, path: Optional[str] = None):
+        self._memory: LRUCache = LRUCache(maxsize=maxsize)
+        self._path = path
+        self._write_lock = asyncio.Lock()
+        if self._path:
+            self._load()
+
+    def _load(self):
+        """Warm the memory tier with unexpired entries from the disk tier, then compact the file."""
+        if not os.path.exists(self._path):
+            return
+
+        now = time.time()
+        lines = 0
+        try:
+            with open(self._path, "rb") as f:
+                for line in f:
+                    lines += 1
+                    try:
+                        entry = orjson.loads(line)
+                    except orjson.JSONDecodeError:
+                        continue
+                    if entry["expires_at"] > now:
+                        self._memory[entry["key"]] = (entry["expires_at"], entry["value"])
+                    else:
+                        self._memory.pop(entry["key"], None)
+        except OSError as e:
+            logger.warning(f"Error reading result cache {self._path}: {str(e)}")
+            return
+
+        # Rewrites and expired or evicted entries would otherwise pile up in
+        # the file forever; keep only what the memory tier still holds
+        if lines > len(self._memory):
+            self._compact()
+
+    def _compact(self):
+        """Atomically replace the disk tier with the entries in the memory tier."""
+        tmp_path = f"{self._path}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                for key, (expires_at, value) in self._memory.items():
+                    f.write(orjson.dumps({"key": key, "expires_at": expires_at, "value": value}, default=str) + b"\n")
+            os.replace(tmp_path, self._path)
+        except OSError as e:
+            logger.warning(f"Error compacting result cache {self._path}: {str(e)}")
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for key, or None if missing or expired."""
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.time():
+            self._memory.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value: Any, ttl: int):
+        """Store value under key for ttl seconds, persisting it if a disk tier is configured."""
+        expires_at = time.time() + ttl
+        self._memory[key] = (expires_at, value)
+        if not self._path:
+            return
+
+        # The disk tier is best effort: a value that can't be serialized or
+        # written stays cached in memory and never fails the caller
+        try:
+            line = orjson.dumps({"key": key, "expires_at": expires_at, "value": value}, default=str) + b"\n"
+        except TypeError as e:
+            logger.warning(f"Error serializing result cache entry: {str(e)}")
+            return
+        async with self._write_lock:
+            try:
+                await asyncio.to_thread(self._append, line)
+            except OSError as e:
+                logger.warning(f"Error writing result cache {self._path}: {str(e)}")
+
+    def _append(self, line: bytes):
+        os.makedirs(os.path.dirname(self._path) or ".", exist_ok=True)
+        with open(self._path, "ab") as f:
+            f.write(line)
@@ -1,6 +1,7 @@
+from functools import cached_property
 from typing import Any, Dict, Generic, List, Optional, Type, TypeVar, Union
 from sqlalchemy.orm import Session
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, inspect
 from pydantic import BaseModel
 
 from app.models.base import Base
@@ -14,6 +15,11 @@ class BaseRepository(Generic[ModelType]):
     def __init__(self, model: Type[ModelType]):
         self.model = model
 
+    @cached_property
+    def _updatable_fields(self) -> frozenset:
+        """Mapped attribute names that update() may assign, resolved once per repository."""
+        return frozenset(inspect(self.model).attrs.keys())
+
     def create(self, db: Session, *, obj_in: Dict[str, Any]) -> ModelType:
         """Create a new record."""
         db_obj = self.model(**obj_in)
@@ -41,9 +47,15 @@ class BaseRepository(Generic[ModelType]):
         else:
             update_data = obj_in.dict(exclude_unset=True)
         
-        for field in update_data:
-            if hasattr(db_obj, field):
-                setattr(db_obj, field, update_data[field])
+        updatable_fields = self._updatable_fields
+        changes = {field: value for field, value in update_data.items()
+                   if field in updatable_fields and field != "id"}
+        # Nothing to write: skip the commit and refresh round trips
+        if not changes:
+            return db_obj
+        
+        for field, value in changes.items():
+            setattr(db_obj, field, value)
                 
         db.add(db_obj)
         db.commit()
@@ -56,4 +68,4 @@ class BaseRepository(Generic[ModelType]):
         if obj:
             db.delete(obj)
             db.commit()
-        return obj 
\ No newline at end of file
+        return obj
@@ -1,20 +1,25 @@
 from fastapi import FastAPI, HTTPException, Depends
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 import uvicorn
 from dotenv import load_dotenv
 from datetime import datetime
 from pydantic import BaseModel
 from typing import Dict, Any, Optional, List
+from logging.handlers import QueueHandler, QueueListener
 import asyncio
+import httpx
 import json
+import logging
 import os
+import queue
 import sys
 from sqlalchemy.orm import Session
 
 from .core.database import get_db, init_db as db_init
 from .core.ai_service import AIService
+from .core.concurrency import llm_semaphore
 
 def initialize_database():
     """Initialize the database and create tables."""
@@ -81,6 +86,42 @@ try:
 except Exception as e:
     print(f"❌ Failed to load workflow router: {e}")
 
+# PR reviewers are built per request; they share one pooled GitHub client so
+# each review reuses warm connections instead of opening its own
+github_http_client = httpx.AsyncClient(
+    timeout=30.0,
+    limits=httpx.Limits(max_keepalive_connections=10, keepalive_expiry=60.0)
+)
+
+@app.on_event("shutdown")
+async def close_github_http_client():
+    await github_http_client.aclose()
+
+class _RootForwardingHandler(logging.Handler):
+    """Hands records drained from the log queue to the root logger's handlers"""
+    
+    def emit(self, record: logging.LogRecord):
+        logging.getLogger().handle(record)
+
+# Orchestrator step failures are logged through a queue drained on a
+# background thread, so a burst of errors never blocks the event loop on
+# handler I/O
+orchestrator_logger = logging.getLogger("app.agents.orchestrator")
+orchestrator_log_handler = QueueHandler(queue.SimpleQueue())
+orchestrator_log_listener = QueueListener(orchestrator_log_handler.queue, _RootForwardingHandler())
+
+@app.on_event("startup")
+async def start_orchestrator_log_listener():
+    orchestrator_log_listener.start()
+    orchestrator_logger.addHandler(orchestrator_log_handler)
+    orchestrator_logger.propagate = False
+
+@app.on_event("shutdown")
+async def stop_orchestrator_log_listener():
+    orchestrator_logger.removeHandler(orchestrator_log_handler)
+    orchestrator_logger.propagate = True
+    orchestrator_log_listener.stop()
+
 # Request/Response Models
 class ProjectScopeRequest(BaseModel):
     description: str
@@ -316,12 +357,12 @@ async def analyze_security(request: SecurityAnalyzeRequest, db: Session = Depend
         }
 
 # PR REVIEW ENDPOINT (for PRReviewer.tsx)
-@app.post("/api/review-pr")
+@app.post("/api/review-pr", response_class=ORJSONResponse)
 async def review_pr(request: PRReviewRequest, db: Session = Depends(get_db)):
     """Review PR - compatible with frontend"""
     try:
         from .agents.pr_reviewer import PRReviewer
-        pr_reviewer = PRReviewer(db_session=db)
+        pr_reviewer = PRReviewer(db_session=db, http_client=github_http_client, llm_semaphore=llm_semaphore())
         
         result = await pr_reviewer.review_pr(
             pr_url=request.pr_url,
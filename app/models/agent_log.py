@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, Enum
+from sqlalchemy import Column, Integer, String, ForeignKey, Text, JSON, Enum, Index
 from sqlalchemy.orm import relationship
 import enum
 
@@ -15,6 +15,12 @@ class AgentLog(Base, TimestampMixin):
     """Agent Log model for tracking agent activities, errors, and audits."""
     
     __tablename__ = 'agent_logs'
+    __table_args__ = (
+        # Serve the per-project and per-task listings, which filter on the
+        # owner and sort newest first, straight from the index
+        Index('ix_agent_logs_project_id_created_at', 'project_id', 'created_at'),
+        Index('ix_agent_logs_agent_task_id_created_at', 'agent_task_id', 'created_at'),
+    )
     
     id = Column(Integer, primary_key=True)
     agent_type = Column(String(64), nullable=False)
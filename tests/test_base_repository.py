@@ -0,0 +1,54 @@
+"""
+Tests for BaseRepository.update
+"""
+
+import pytest
+from sqlalchemy import Column, Integer, String, create_engine, event
+from sqlalchemy.orm import Session, declarative_base
+
+from app.crud.base import BaseRepository
+
+ModelBase = declarative_base()
+
+
+class Widget(ModelBase):
+    __tablename__ = "widgets"
+
+    id = Column(Integer, primary_key=True)
+    name = Column(String(64), nullable=False)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    ModelBase.metadata.create_all(engine)
+    with Session(engine) as session:
+        commits = []
+        event.listen(session, "after_commit", lambda s: commits.append(s))
+        session.commits = commits
+        yield session
+
+
+@pytest.fixture
+def widget(db):
+    widget = Widget(name="gear")
+    db.add(widget)
+    db.commit()
+    db.commits.clear()
+    return widget
+
+
+def test_update_assigns_mapped_fields(db, widget):
+    updated = BaseRepository(Widget).update(db, db_obj=widget, obj_in={"name": "cog"})
+    assert updated is widget
+    assert db.get(Widget, widget.id).name == "cog"
+    assert len(db.commits) == 1
+
+
+def test_update_without_changes_skips_the_commit(db, widget):
+    """Unknown fields and the primary key are ignored, so there is nothing to write"""
+    updated = BaseRepository(Widget).update(db, db_obj=widget, obj_in={"id": 99, "colour": "red"})
+    assert updated is widget
+    assert widget.id != 99
+    assert not hasattr(widget, "colour")
+    assert db.commits == []
@@ -0,0 +1,34 @@
+"""
+Tests for the shared LLM concurrency limit
+"""
+
+import asyncio
+
+from app.core.concurrency import llm_semaphore
+from app.core.config import settings
+
+
+def test_llm_semaphore_is_shared_within_a_loop():
+    async def main():
+        return llm_semaphore(), llm_semaphore()
+
+    first, second = asyncio.run(main())
+    assert first is second
+    assert first._value == settings.LLM_MAX_CONCURRENCY
+
+
+def test_llm_semaphore_is_not_reused_across_loops():
+    """Each loop gets its own semaphore, so contention never crosses loops"""
+    async def contend():
+        semaphore = llm_semaphore()
+        await asyncio.gather(*(_hold(semaphore) for _ in range(settings.LLM_MAX_CONCURRENCY + 1)))
+        return semaphore
+
+    first = asyncio.run(contend())
+    second = asyncio.run(contend())
+    assert first is not second
+
+
+async def _hold(semaphore: asyncio.Semaphore):
+    async with semaphore:
+        await asyncio.sleep(0)
@@ -0,0 +1,61 @@
+"""
+Tests for PRReviewer's URL and review text parsing
+"""
+
+import pytest
+
+from app.agents.pr_reviewer import PRReviewer, _FILE_REFERENCE_RE, _parse_pr_url
+
+
+@pytest.fixture
+def reviewer():
+    return PRReviewer(db_session=object())
+
+
+@pytest.mark.parametrize("pr_url", [
+    "https://github.com/owner/repo/pull/42",
+    "https://github.com/owner/repo/pull/42/files",
+    "https://github.com/owner/repo/pull/42#discussion_r1",
+    "https://github.com/owner/repo/pull/42?diff=split",
+])
+def test_parse_pr_url(pr_url):
+    assert _parse_pr_url(pr_url) == ("owner", "repo", "42")
+
+
+@pytest.mark.parametrize("pr_url", [
+    "https://gitlab.com/owner/repo/pull/1",
+    "http://github.com/owner/repo/pull/1",
+    "https://github.com/owner/repo/issues/1",
+    "https://github.com/owner/repo/pull/abc",
+    "https://github.com/owner/repo/pull/",
+    "https://github.com//repo/pull/1",
+])
+def test_parse_pr_url_rejects_other_urls(pr_url):
+    with pytest.raises(ValueError, match="Invalid GitHub PR URL"):
+        _parse_pr_url(pr_url)
+
+
+def test_extract_findings_links_each_finding_to_its_file(reviewer):
+    content = (
+        "Security concerns:\n"
+        "1. SQL injection in app/db.py via raw queries.\n"
+        "2. Weak hashing in auth/hash.py is bad."
+    )
+    findings = reviewer._extract_findings(content)
+    assert findings["suggestions"] == [
+        {"text": "SQL injection in app/db.py via raw queries.", "file": "app/db.py", "type": "improvement"},
+        {"text": "Weak hashing in auth/hash.py is bad.", "file": "auth/hash.py", "type": "improvement"},
+    ]
+    assert {"text": "in app/db.py via raw queries.", "file": "app/db.py", "severity": "low"} in findings["security_issues"]
+    assert findings["performance_issues"] == []
+
+
+def test_extract_findings_matches_a_search_of_the_finding_text(reviewer):
+    """A file mention that runs into a finding can match differently once cut at the finding's start"""
+    # "file securityfix.login" is one mention in the full text, but the
+    # security finding starts inside it, and in its own text "login app/db.py"
+    # reads as "in app/db.py"
+    content = "See file securityfix.login app/db.py"
+    (finding,) = reviewer._extract_findings(content)["security_issues"]
+    assert finding["text"] == "fix.login app/db.py"
+    assert finding["file"] == _FILE_REFERENCE_RE.search(finding["text"]).group(1) == "app/db.py"
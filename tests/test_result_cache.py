@@ -0,0 +1,114 @@
+"""
+Tests for the two-tier agent result cache
+"""
+
+import asyncio
+import types
+
+import orjson
+
+from app.core import result_cache
+from app.core.result_cache import ResultCache
+
+
+def _read_entries(path):
+    with open(path, "rb") as f:
+        return [orjson.loads(line) for line in f]
+
+
+def test_memory_tier_evicts_least_recently_used():
+    async def main():
+        cache = ResultCache(maxsize=2)
+        await cache.set("a", 1, 60)
+        await cache.set("b", 2, 60)
+        cache.get("a")  # "b" is now the least recently used
+        await cache.set("c", 3, 60)
+        return cache
+
+    cache = asyncio.run(main())
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_entries_expire_after_their_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(result_cache, "time", types.SimpleNamespace(time=lambda: now[0]))
+
+    cache = ResultCache(maxsize=8)
+    asyncio.run(cache.set("key", {"score": 90}, 60))
+    assert cache.get("key") == {"score": 90}
+
+    now[0] += 60
+    assert cache.get("key") is None
+
+
+def test_load_replays_the_latest_live_entry_per_key(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+
+    async def fill():
+        cache = ResultCache(maxsize=8, path=path)
+        await cache.set("a", "old", 60)
+        await cache.set("a", "new", 60)
+        await cache.set("b", {"files": ["main.py"]}, 60)
+        await cache.set("expired", 1, -1)
+
+    asyncio.run(fill())
+    with open(path, "ab") as f:
+        f.write(b"not json\n")
+
+    cache = ResultCache(maxsize=8, path=path)
+    assert cache.get("a") == "new"
+    assert cache.get("b") == {"files": ["main.py"]}
+    assert cache.get("expired") is None
+
+
+def test_load_compacts_the_file_to_live_entries(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+
+    async def fill():
+        cache = ResultCache(maxsize=2, path=path)
+        for i in range(5):
+            await cache.set("a", i, 60)
+        await cache.set("b", "b", 60)
+        await cache.set("c", "c", 60)
+        await cache.set("expired", 1, -1)
+
+    asyncio.run(fill())
+    assert len(_read_entries(path)) == 8
+
+    ResultCache(maxsize=2, path=path)
+    entries = _read_entries(path)
+    # Only what the memory tier still holds survives: rewrites, expired
+    # entries and anything evicted on load are dropped
+    assert sorted(entry["key"] for entry in entries) == ["b", "c"]
+    assert not (tmp_path / "cache.jsonl.tmp").exists()
+
+    # Loading an already compact file leaves it as it is
+    ResultCache(maxsize=2, path=path)
+    assert _read_entries(path) == entries
+
+
+def test_concurrent_sets_write_whole_lines(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+
+    async def main():
+        cache = ResultCache(maxsize=64, path=path)
+        await asyncio.gather(*(cache.set(f"key-{i}", {"value": "x" * 4096, "i": i}, 60) for i in range(50)))
+
+    asyncio.run(main())
+    entries = _read_entries(path)
+    assert sorted(entry["value"]["i"] for entry in entries) == list(range(50))
+
+
+def test_unserializable_value_stays_in_memory_only(tmp_path):
+    path = str(tmp_path / "cache.jsonl")
+
+    async def main():
+        cache = ResultCache(maxsize=8, path=path)
+        await cache.set("bad", {(1, 2): "tuple keys"}, 60)
+        return cache
+
+    cache = asyncio.run(main())
+    assert cache.get("bad") == {(1, 2): "tuple keys"}
+    assert not (tmp_path / "cache.jsonl").exists()